@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
 from asyncio import AbstractEventLoop
 from logging import Logger
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING
 
 from logger import global_logger
+from utils import PostedArticle
 
 if TYPE_CHECKING:
     from nntp_server import AsyncNNTPServer
@@ -22,7 +23,7 @@ class Backend(ABC):
         pass
 
     @abstractmethod
-    async def save_article(self, article_buffer: List[str]):
+    async def save_article(self, article: PostedArticle):
         pass
 
     @abstractmethod
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.dtn7sqlite.lookup import ArticlePointer
+from backend.dtn7sqlite.utils import article_body
+from utils import encode_multiline
+
+
+class RenderedArticle(ArticlePointer):
+    """
+    An article rendered for ARTICLE/HEAD/BODY: header and body as blocks of wire-ready bytes,
+    i.e. CRLF line endings and dot-stuffed, but without the status line, the empty line between
+    header and body and the terminating dot line.
+
+    The body is only loaded by ARTICLE and BODY, so it is None for articles that have only been
+    looked up by HEAD or STAT so far.
+    """
+
+    __slots__ = ("created_at", "head", "body")
+
+    def __init__(
+        self,
+        id: int,
+        number: int,
+        message_id: str,
+        group_id: int,
+        created_at: datetime,
+        head: bytes,
+        body: Optional[bytes],
+    ):
+        super().__init__(id=id, number=number, message_id=message_id, group_id=group_id)
+        self.created_at: datetime = created_at
+        self.head: bytes = head
+        self.body: Optional[bytes] = body
+
+    @classmethod
+    def render(cls, row: dict, header_lines: List[str]) -> "RenderedArticle":
+        """
+        Renders an article from its row. The body is rendered if the row contains it, i.e. its
+        body and body_z fields.
+        """
+        return cls(
+            id=row["id"],
+            number=row["number"],
+            message_id=row["message_id"],
+            group_id=row["newsgroup_id"],
+            created_at=row["created_at"],
+            head=encode_multiline(header_lines, terminate=False),
+            body=encode_multiline([article_body(row)], terminate=False) if "body" in row else None,
+        )
+
+    def with_body(self, body: str) -> "RenderedArticle":
+        return RenderedArticle(
+            id=self.id,
+            number=self.number,
+            message_id=self.message_id,
+            group_id=self.group_id,
+            created_at=self.created_at,
+            head=self.head,
+            body=encode_multiline([body], terminate=False),
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.head) + (len(self.body) if self.body is not None else 0)
+
+
+class ArticleCache:
+    """
+    Size-bounded LRU cache of rendered articles, looked up by message-id or by group and article
+    number. New articles tend to be fetched by every reader of a group shortly after they arrive,
+    so those are served from here without a DB query or re-rendering.
+
+    Entries must be dropped whenever articles are deleted from the DB, see expire() and
+    remove_group(). A max_bytes of 0 switches the cache off.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[str, RenderedArticle]" = OrderedDict()
+        self._numbers: Dict[Tuple[int, int], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        lookups: int = self.hits + self.misses
+        hit_rate: float = 100 * self.hits / lookups if lookups > 0 else 0.0
+        return (
+            f"{len(self._entries)} articles, {self.size}/{self.max_bytes} bytes, {self.hits} hits,"
+            f" {self.misses} misses ({hit_rate:.1f}% hit rate)"
+        )
+
+    def get(self, message_id: str) -> Optional[RenderedArticle]:
+        entry: Optional[RenderedArticle] = self._entries.get(message_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(message_id)
+        return entry
+
+    def get_by_number(self, group_id: int, number: int) -> Optional[RenderedArticle]:
+        message_id: Optional[str] = self._numbers.get((group_id, number))
+        if message_id is None:
+            self.misses += 1
+            return None
+        return self.get(message_id)
+
+    def put(self, entry: RenderedArticle) -> None:
+        if self.max_bytes <= 0 or entry.size > self.max_bytes:
+            return
+        self._discard(entry.message_id)
+        self._entries[entry.message_id] = entry
+        self._numbers[(entry.group_id, entry.number)] = entry.message_id
+        self.size += entry.size
+        while self.size > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, message_ids: Iterable[str]) -> None:
+        for message_id in message_ids:
+            self._discard(message_id)
+
+    def expire(self, cutoff: datetime) -> None:
+        """
+        Drops all articles created before cutoff, i.e. the articles the janitor just deleted.
+        """
+        self.invalidate([e.message_id for e in self._entries.values() if e.created_at < cutoff])
+
+    def remove_group(self, group_id: int) -> None:
+        self.invalidate([e.message_id for e in self._entries.values() if e.group_id == group_id])
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._numbers.clear()
+        self.size = 0
+
+    def _discard(self, message_id: str) -> None:
+        entry: Optional[RenderedArticle] = self._entries.pop(message_id, None)
+        if entry is not None:
+            self._numbers.pop((entry.group_id, entry.number), None)
+            self.size -= entry.size
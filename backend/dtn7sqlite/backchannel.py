@@ -0,0 +1,128 @@
+import asyncio
+import time
+from asyncio import Queue, Task
+from concurrent.futures import Executor
+from logging import Logger
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+
+class BackchannelQueue:
+    """
+    Bounded work queue for bundles received over the WS back-channel:
+
+        WS read loop -> queue -> N decode workers (executor threads) -> group commit -> DB
+
+    Bursts of bundles after a contact window are queued up instead of each spawning its own task.
+    Once the queue is full, put() blocks, which stops the WS read loop from pulling more data off
+    the socket until the workers have caught up.
+
+    Decoding a bundle (CBOR, zlib, hashing) is CPU-bound, so the workers run it in executor, whose
+    threads should match their number. zlib and hashlib release the GIL on large inputs, so
+    decoding bursts of large articles actually runs in parallel and never stalls the event loop.
+
+    Decoded articles are not written one by one. The committer collects them for up to
+    commit_interval milliseconds or commit_max_items articles, whichever comes first, and hands the
+    whole batch to a single commit call, so a burst costs one transaction instead of several
+    autocommitted statements per article.
+    """
+
+    def __init__(
+        self,
+        decode: Callable[[dict], Optional[Tuple[dict, str]]],
+        commit: Callable[[List[Tuple[dict, str]]], Awaitable[None]],
+        logger: Logger,
+        executor: Executor,
+        maxsize: int,
+        workers: int,
+        commit_max_items: int,
+        commit_interval: int,
+    ):
+        self._decode = decode
+        self._commit = commit
+        self._logger = logger
+        self._executor: Executor = executor
+        self._queue: Queue = Queue(maxsize=maxsize)
+        self._num_workers: int = max(1, workers)
+        self._commit_max_items: int = max(1, commit_max_items)
+        self._commit_interval: float = commit_interval / 1000
+        self._commit_queue: Queue = Queue(maxsize=2 * self._commit_max_items)
+        self.processed: int = 0
+        self.total_latency: float = 0.0
+        self.max_latency: float = 0.0
+
+    def start(self) -> List[Task]:
+        tasks: List[Task] = [asyncio.create_task(self._worker()) for _ in range(self._num_workers)]
+        tasks.append(asyncio.create_task(self._committer()))
+        return tasks
+
+    async def put(self, ws_struct: dict) -> None:
+        if self._queue.full():
+            self._logger.warning(
+                "Back-channel queue is full (%d items), pausing WS reads", self._queue.maxsize
+            )
+        await self._queue.put((time.monotonic(), ws_struct))
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() + self._commit_queue.qsize()
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.processed if self.processed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"depth {self.depth}, {self.processed} processed, latency avg"
+            f" {self.avg_latency * 1000:.1f}ms max {self.max_latency * 1000:.1f}ms"
+        )
+
+    def _record_latency(self, enqueued_at: float) -> None:
+        # latency from arrival on the WS to being committed, including the time spent queued
+        latency: float = time.monotonic() - enqueued_at
+        self.processed += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            enqueued_at, ws_struct = await self._queue.get()
+            try:
+                decoded: Optional[Tuple[dict, str]] = await loop.run_in_executor(
+                    self._executor, self._decode, ws_struct
+                )
+            except Exception as e:  # noqa E722
+                self._logger.exception(e)
+                self._logger.warning("Ignoring the previous error and continuing processing.")
+                decoded = None
+            if decoded is None:
+                self._record_latency(enqueued_at)
+            else:
+                await self._commit_queue.put((enqueued_at, decoded))
+            self._queue.task_done()
+
+    async def _committer(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[float, Tuple[dict, str]]] = [await self._commit_queue.get()]
+            deadline: float = loop.time() + self._commit_interval
+            while len(batch) < self._commit_max_items:
+                if not self._commit_queue.empty():
+                    batch.append(self._commit_queue.get_nowait())
+                    continue
+                timeout: float = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._commit_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._commit([decoded for _, decoded in batch])
+            except Exception as e:  # noqa E722
+                self._logger.exception(e)
+                self._logger.error("Could not commit batch of %d back-channel articles", len(batch))
+            for enqueued_at, _ in batch:
+                self._record_latency(enqueued_at)
+            self._logger.debug("Back-channel queue: %s", self)
@@ -1,8 +1,10 @@
 import asyncio
+import logging
+import time
 import zlib
 from asyncio import AbstractEventLoop, Task
-from collections import defaultdict
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import (
     TYPE_CHECKING,
     Callable,
@@ -12,20 +14,32 @@ from typing import (
     List,
     Optional,
     Set,
+    Tuple,
 )
 
 import cbor2
 import websockets
 from cbor2 import CBORDecodeEOF
-from py_dtn7 import Bundle, DTNRESTClient, from_dtn_timestamp
+from py_dtn7 import from_dtn_timestamp
 from requests.exceptions import ConnectionError
-from tortoise import Tortoise, run_async
-from tortoise.exceptions import IntegrityError, OperationalError
-from tortoise.transactions import in_transaction
+from tortoise import BaseDBAsyncClient, Tortoise, run_async
 
 from backend.base import Backend
-from backend.dtn7sqlite import get_all_newsgroups
+from backend.dtn7sqlite.article_cache import ArticleCache
+from backend.dtn7sqlite.backchannel import BackchannelQueue
 from backend.dtn7sqlite.config import config
+from backend.dtn7sqlite.db import db_config
+from backend.dtn7sqlite.ingest import IngestPipeline, store_articles_and_clear_spool
+from backend.dtn7sqlite.janitor import (
+    ExpiryScheduler,
+    JanitorStats,
+    expire_articles,
+    expire_spool,
+    incremental_vacuum,
+    next_article_expiry,
+    next_spool_expiry,
+)
+from backend.dtn7sqlite.migrations import is_fresh_db, migrate
 from backend.dtn7sqlite.models import Article, DTNMessage, Newsgroup
 from backend.dtn7sqlite.nntp_commands import (
     article,
@@ -47,13 +61,19 @@ from backend.dtn7sqlite.nntp_commands import (
     post,
     quit_,
 )
+from backend.dtn7sqlite.registry import NewsgroupRegistry
+from backend.dtn7sqlite.rest_client import AsyncDTNRESTClient
+from backend.dtn7sqlite.spool import SpoolDelivery, record_spool_failures
 from backend.dtn7sqlite.utils import (
     _bp7sender_to_nntpfrom,
     _bundleid_to_messageid,
-    _delete_expired_articles,
+    _expiry_cutoff,
+    add_overview_stats,
+    compress_body,
     get_article_hash,
     group_name_to_endpoint,
 )
+from utils import PostedArticle
 
 if TYPE_CHECKING:
     from nntp_server import AsyncNNTPServer
@@ -85,13 +105,18 @@ class DTN7Backend(Backend):
         "xover": over.do_over,
     }
 
-    _group_names: List[str]
     # _ready_to_send: bool
-    _rest_client: Optional[DTNRESTClient]
+    _rest_client: Optional[AsyncDTNRESTClient]
+    _rest_executor: ThreadPoolExecutor
+    _decode_executor: ThreadPoolExecutor
     _ws_client: Optional[websockets.WebSocketClientProtocol]
     _loop: AbstractEventLoop
-    _newsgroups: Dict
+    _newsgroups: NewsgroupRegistry
     _background_tasks: Set[Task]
+    _article_cache: ArticleCache
+    _ingest_pipeline: Optional[IngestPipeline]
+    _backchannel_queue: Optional[BackchannelQueue]
+    _expiry: Optional[ExpiryScheduler]
 
     def __init__(self, server: "AsyncNNTPServer", loop: AbstractEventLoop):
         super().__init__(server=server, loop=loop)
@@ -105,15 +130,26 @@ class DTN7Backend(Backend):
         """
         run_async(self._init_db())
         self._loop = loop
-        self._newsgroups = {}
-        self._group_names = []
+        self._newsgroups = NewsgroupRegistry()
+        self._article_cache = ArticleCache(max_bytes=config["backend"]["article_cache_size"])
         self._background_tasks = set()
+        self._ingest_pipeline = None
+        self._backchannel_queue = None
+        self._expiry = None
 
         self._rest_client = None
+        self._rest_executor = ThreadPoolExecutor(
+            max_workers=config["dtnd"]["rest_workers"], thread_name_prefix="dtnd-rest"
+        )
+        self._decode_executor = ThreadPoolExecutor(
+            max_workers=config["backchannel"]["workers"], thread_name_prefix="bundle-decode"
+        )
         self._ws_client = None
 
     def stop(self) -> None:
         self.logger.info("Stopping DTN7Backend")
+        self._rest_executor.shutdown(wait=False)
+        self._decode_executor.shutdown(wait=False)
         self._loop.stop()
         self._loop.close()
 
@@ -125,29 +161,48 @@ class DTN7Backend(Backend):
         # config.toml is single source of truth, so:
         # add all newsgroups that are in config.toml but not in db,
         # delete all in db and not in config
-        self._newsgroups = await get_all_newsgroups()
-        self._group_names = list(self._newsgroups.keys())
+        await self._newsgroups.load()
         want_set: set = set(config["usenet"]["newsgroups"])
-        have_set: set = set(self._group_names)
+        have_set: set = set(self._newsgroups.names)
         self.logger.info("Reconciling newsgroup configuration with database")
         for gn in want_set - have_set:
-            self.logger.info(f" -> Adding new group '{gn}'")
+            self.logger.info(" -> Adding new group '%s'", gn)
             new_group: Newsgroup = await Newsgroup.create(name=gn)
-            self._group_names.append(gn)
-            self._newsgroups[gn] = new_group
+            self._newsgroups.add(new_group)
         for gn in have_set - want_set:
-            self.logger.info(f" -> Removing group '{gn}'")
+            self.logger.info(" -> Removing group '%s'", gn)
+            self._article_cache.remove_group(self._newsgroups[gn].id)
             await Newsgroup.filter(name=gn).delete()
-            self._group_names.remove(gn)
-            del self._newsgroups[gn]
+            self._newsgroups.remove(gn)
 
-        self.logger.debug(f"Found {len(self._group_names)} active newsgroups on this server.")
+        self.logger.debug("Found %d active newsgroups on this server.", len(self._newsgroups))
 
         await self._rest_connector()
 
         await self._ingest_all_from_dtnd()
 
-        _janitor_task: Task = self._loop.create_task(self._janitor())
+        # queues bind to the running loop, so this can't be set up in __init__
+        self._backchannel_queue = BackchannelQueue(
+            decode=self._decode_backchannel_data,
+            commit=self._commit_backchannel_articles,
+            logger=self.logger,
+            executor=self._decode_executor,
+            maxsize=config["backchannel"]["queue_size"],
+            workers=config["backchannel"]["workers"],
+            commit_max_items=config["backchannel"]["commit_max_items"],
+            commit_interval=config["backchannel"]["commit_interval"],
+        )
+        for _worker_task in self._backchannel_queue.start():
+            self._background_tasks.add(_worker_task)
+            _worker_task.add_done_callback(self._background_tasks.discard)
+
+        self._expiry = ExpiryScheduler(
+            run=self._janitor,
+            next_deadlines=self._next_expiries,
+            logger=self.logger,
+            window=config["janitor"]["batch_window"] / 1000,
+        )
+        _janitor_task: Task = self._loop.create_task(self._expiry.run_forever())
         _ws_connector_task: Task = self._loop.create_task(self._ws_runner())
         _rest_connector_task: Task = self._loop.create_task(self._rest_runner())
         self._background_tasks.add(_janitor_task)
@@ -161,36 +216,38 @@ class DTN7Backend(Backend):
 
     async def _deliver_spool(self) -> None:
         """
-        Gets all spooled messages from the DB and (re)sends them to the DTNd. In here, we assume all
-        connections to the DTNd are alive and healthy, so we do only minimal error recovery.
+        Streams all spooled messages from the DB and (re)sends them to the DTNd, see
+        SpoolDelivery.
         """
-        msgs: List[dict] = await DTNMessage.all().values(
-            "source", "destination", "data", "hash", "delivery_notification", "lifetime"
-        )
-
         while self._ws_client is None:
             await asyncio.sleep(config["backoff"]["constant_wait"])
 
-        self.logger.info(f"Sending {len(msgs)} spooled messages to DTNd")
-
-        for msg in msgs:
-            await self._send_to_dtnd(
-                dtn_args={
-                    "destination": msg["destination"],
-                    "source": msg["source"],
-                    "delivery_notification": msg["delivery_notification"],
-                    "lifetime": msg["lifetime"],
-                },
-                dtn_payload=msg["data"],
-                hash_=msg["hash"],
-            )
-            await asyncio.sleep(0.0001)
-
-        self.logger.info(f"Done sending {len(msgs)} spooled messages to DTNd")
+        await SpoolDelivery(
+            send=self._send_spooled,
+            connected=lambda: self._ws_client is not None,
+            logger=self.logger,
+            page_size=config["spool"]["page_size"],
+            window=config["spool"]["window"],
+            rate=config["spool"]["rate"],
+            initial_wait=config["backoff"]["initial_wait"],
+            max_wait=config["backoff"]["reconnection_pause"],
+            max_retries=config["backoff"]["max_retries"],
+        ).run()
+
+    async def _send_spooled(self, msg: dict) -> None:
+        await self._send_bundle(
+            dtn_args={
+                "destination": msg["destination"],
+                "source": msg["source"],
+                "delivery_notification": msg["delivery_notification"],
+                "lifetime": msg["lifetime"],
+            },
+            dtn_payload=msg["data"],
+        )
 
     async def _send_to_dtnd(self, dtn_args: dict, dtn_payload: dict, hash_: str):
         """
-        Uses the WS interface of the dtnd to send dtn_payload as a cbor encoded payload block.
+        Sends dtn_payload to the dtnd, see _send_bundle. A failure is logged in the spool entry.
         Args:
             dtn_args: all relevant dtnd-data: source, destination, lifetime, delivery notification
             dtn_payload: dict of payload data to be cbor-encoded and sent
@@ -198,66 +255,76 @@ class DTN7Backend(Backend):
                    difficulties connecting with dtnd
         """
         try:
-            self.logger.info(
-                f"Sending article '{dtn_payload['subject']}' to DTNd endpoint"
-                f" {dtn_args['destination']}"
-            )
-
-            if config["bundles"]["compress_body"]:
-                self.logger.debug("Compression is turned on, compressing body with zlib")
-                dtn_payload["compressed"] = True
-                dtn_payload["body"] = zlib.compress(dtn_payload["body"].encode())
-
-            if self._ws_client is not None:
-                payload: bytes = cbor2.dumps(
-                    {
-                        "src": dtn_args["source"],
-                        "dst": dtn_args["destination"],
-                        "delivery_notification": dtn_args["delivery_notification"],
-                        "lifetime": dtn_args["lifetime"],
-                        "data": cbor2.dumps(dtn_payload),
-                    }
-                )
-                await self._ws_client.send(payload)
-            else:
-                raise ConnectionError(
-                    "No current connection to WS client. Article is in spool and will be sent on"
-                    " reconnect."
-                )
+            await self._send_bundle(dtn_args=dtn_args, dtn_payload=dtn_payload)
         except Exception as e:  # noqa E722
             # log failure in spool entry
             try:
                 self.logger.debug(
-                    "Not able to contact WS endpoint, logging error to spooled article with hash"
-                    f" {hash_}"
-                )
-                msg: DTNMessage = await DTNMessage.get_or_none(hash=hash_)
-                if msg.error_log is None:
-                    msg.error_log = ""
-                msg.error_log += (
-                    f"\n{datetime.utcnow().isoformat()} ERROR Failure delivering to DTNd: {e}"
+                    (
+                        "Not able to contact WS endpoint, logging error to spooled article with"
+                        " hash %s"
+                    ),
+                    hash_,
                 )
-                await msg.save()
+                await record_spool_failures([(hash_, str(e))])
             except Exception as e:  # noqa E722
                 self.logger.warning(
-                    f"Could not update the error log of spool entry for message {hash_}: {e}"
+                    "Could not update the error log of spool entry for message %s: %s", hash_, e
                 )
 
+    async def _send_bundle(self, dtn_args: dict, dtn_payload: dict) -> None:
+        """
+        Uses the WS interface of the dtnd to send dtn_payload as a cbor encoded payload block.
+        Args:
+            dtn_args: all relevant dtnd-data: source, destination, lifetime, delivery notification
+            dtn_payload: dict of payload data to be cbor-encoded and sent. It is not modified, so
+                         it can be sent again
+        Raises:
+            ConnectionError: if there is no connection to the WS interface of the dtnd
+        """
+        self.logger.info(
+            "Sending article '%s' to DTNd endpoint %s",
+            dtn_payload["subject"],
+            dtn_args["destination"],
+        )
+
+        if config["bundles"]["compress_body"]:
+            self.logger.debug("Compression is turned on, compressing body with zlib")
+            dtn_payload = dict(dtn_payload)
+            dtn_payload["compressed"] = True
+            dtn_payload["body"] = zlib.compress(dtn_payload["body"].encode())
+
+        if self._ws_client is None:
+            raise ConnectionError(
+                "No current connection to WS client. Article is in spool and will be sent on"
+                " reconnect."
+            )
+        payload: bytes = cbor2.dumps(
+            {
+                "src": dtn_args["source"],
+                "dst": dtn_args["destination"],
+                "delivery_notification": dtn_args["delivery_notification"],
+                "lifetime": dtn_args["lifetime"],
+                "data": cbor2.dumps(dtn_payload),
+            }
+        )
+        await self._ws_client.send(payload)
+
     async def _register_all_groups(self) -> None:
         """
         First gets all active newsgroups from the DB. Then waits for the REST client to go online
         and then registers all groups with the DTNd backend.
         :return: None
         """
-        for group_name in self._group_names:
-            self.logger.info(f"Registering endpoint with REST client: dtn://{group_name}/~news")
-            self._rest_client.register(endpoint=f"dtn://{group_name}/~news")
+        for group_name in self._newsgroups.names:
+            self.logger.info("Registering endpoint with REST client: dtn://%s/~news", group_name)
+            await self._rest_client.register(endpoint=f"dtn://{group_name}/~news")
 
         # also register the email address of sender, so we get info on sent
         # articles through WebSocket back channel
         sender_endpoint: str = self._nntpfrom_to_bp7source(config["usenet"]["email"])
-        self.logger.info(f"Registering WS back-channel: {sender_endpoint}")
-        self._rest_client.register(endpoint=sender_endpoint)
+        self.logger.info("Registering WS back-channel: %s", sender_endpoint)
+        await self._rest_client.register(endpoint=sender_endpoint)
 
     async def _ingest_all_from_dtnd(self) -> None:
         """ """
@@ -273,82 +340,54 @@ class DTN7Backend(Backend):
         )
         received_bundles: Set[str] = set()
         if self._rest_client is not None:
-            for group_name in self._group_names:
+            for group_name in self._newsgroups.names:
                 try:
-                    self.logger.debug(f"Getting known bundles for group '{group_name}'")
-                    new_bundles: List[str] = self._rest_client.get_filtered_bundles(
+                    self.logger.debug("Getting known bundles for group '%s'", group_name)
+                    new_bundles: List[str] = await self._rest_client.get_filtered_bundles(
                         address_part_criteria=group_name
                     )
-                    self.logger.debug(f"Got {len(new_bundles)} articles for group '{group_name}'")
+                    self.logger.debug(
+                        "Got %d articles for group '%s'", len(new_bundles), group_name
+                    )
                     received_bundles.update(new_bundles)
                 except Exception as e:  # noqa E722
-                    self.logger.warning(f"Error getting bundles from REST interface: {e}")
+                    self.logger.warning("Error getting bundles from REST interface: %s", e)
                     self.logger.exception(e)
         else:
             await self._rest_connector()
 
-        try:
-            # open a transaction and commit all new articles to db at once
-            async with in_transaction() as connection:
-                for bundle_id in received_bundles:
-                    # filter out known articles PREMATURE
-                    msg_id = _bundleid_to_messageid(bundle_id)
-                    if msg_id in known_message_ids:
-                        self.logger.debug(f"{msg_id} is a duplicate, discarding")
-                        continue
-
-                    if self._rest_client is None:
-                        await self._rest_connector()
-
-                    try:
-                        bundle = Bundle.from_cbor(self._rest_client.download(bundle_id=bundle_id))
-                    except Exception as e:
-                        self.logger.error(
-                            f"Bundle with ID {bundle_id} could not be deserialized: {e}"
-                        )
-                    else:
-                        # map BP7 to NNTP MAPPING
-                        from_: str = _bp7sender_to_nntpfrom(sender=bundle.source)
-
-                        group_name: str = (
-                            bundle.destination.replace("dtn://", "")
-                            .replace("//", "")
-                            .replace("/~news", "")
-                        )
+        # filter out known articles PREMATURE
+        unknown_bundles: List[str] = []
+        for bundle_id in received_bundles:
+            msg_id = _bundleid_to_messageid(bundle_id)
+            if msg_id in known_message_ids:
+                self.logger.debug("%s is a duplicate, discarding", msg_id)
+                continue
+            unknown_bundles.append(bundle_id)
+
+        # downloads run concurrently and articles are committed in batches, each in its own short
+        # transaction, so NNTP readers are never locked out for the whole ingest
+        self._ingest_pipeline = IngestPipeline(
+            download=self._download_bundle,
+            newsgroups=self._newsgroups,
+            logger=self.logger,
+            executor=self._decode_executor,
+            concurrency=config["ingest"]["concurrency"],
+            decoders=config["ingest"]["decoders"],
+            batch_size=config["ingest"]["batch_size"],
+            progress_interval=config["ingest"]["progress_interval"],
+        )
+        await self._ingest_pipeline.run(bundle_ids=unknown_bundles)
 
-                        data: dict = cbor2.loads(bundle.payload_block.data)
-
-                        if data.get("compressed", False):
-                            data["body"] = zlib.decompress(data["body"]).decode()
-
-                        # self.logger.debug(f"Writing article {msg_id} to DB")
-                        await Article.create(
-                            newsgroup=self._newsgroups[group_name],
-                            from_=from_,
-                            subject=data["subject"],
-                            created_at=from_dtn_timestamp(int(bundle.timestamp)),
-                            message_id=msg_id,
-                            body=data["body"],
-                            # path=f"!_ingest_all_from_dtnd",
-                            references=data["references"],
-                            # reply_to=data["reply_to"],
-                            using_db=connection,
-                        )
-                        self.logger.info(
-                            f"Created new newsgroup article {msg_id} in newsgroup '{group_name}'."
-                        )
-        except OperationalError as e:
-            self.logger.error(
-                "Something went very wrong committing the batch of ingested articles from the"
-                f" dtnd. {len(received_bundles)} were not stored in the server DB! Error:"
-                f" {e.__str__()}"
-            )
+    async def _download_bundle(self, bundle_id: str) -> bytes:
+        if self._rest_client is None:
+            await self._rest_connector()
+        return await self._rest_client.download(bundle_id=bundle_id)
 
-    async def save_article(self, article_buffer: List[str]) -> None:
+    async def save_article(self, article: PostedArticle) -> None:
         """
-        Takes an article posted ba an NNTP client as a list of strings and does three things with
-        it:
-          1. parses all relevant article information into data structures
+        Takes an article posted by an NNTP client and does three things with it:
+          1. maps all relevant article information to the DTN payload
           2. saves the article data to a spool which contains articles that are sent but do not have
              a message-id because the dtnd has not acknowledged then yet. In order to later identify
              the article, a hash on some article data is created and stored along with it
@@ -356,8 +395,7 @@ class DTN7Backend(Backend):
              back-channel and of course to propagate the article in the network
 
         Args:
-            article_buffer: list of strings containing the raw lines of article data received from
-                            the NNTP client
+            article: the article as parsed while it was received from the NNTP client
         """
 
         # TODO: support cross posting to multiple newsgroups
@@ -365,31 +403,13 @@ class DTN7Backend(Backend):
         #       https://kb.iu.edu/d/affn
 
         self.logger.debug("Sending article to DTNd and local DTN message spool")
-        header: DefaultDict[str] = defaultdict(str)
-        line: str = article_buffer.pop(0)
-        field_name: str = ""
-        field_value: str
-        while len(line) != 0:
-            try:
-                if ":" in line:
-                    field_name, field_value = map(
-                        lambda s: s.strip(), line.split(sep=":", maxsplit=1)
-                    )
-                    field_name = field_name.strip().lower()
-                    header[field_name] = field_value.strip()
-                elif len(field_name) > 0:
-                    header[field_name] = f"{header[field_name]} {line}"
-            except ValueError:
-                # sometimes clients send fishy headers … we'll just ignore them.
-                pass
-            line = article_buffer.pop(0)
+        header: DefaultDict[str, str] = article.header
 
         # article_group = await Newsgroup.get_or_none(name=header["newsgroups"])
         article_group = self._newsgroups[header["newsgroups"]]
         # TODO: Error handling when newsgroup is not in DB
 
-        # we've popped off the complete header, body is just the joined rest
-        body: str = "\n".join(article_buffer)
+        body: str = article.body
         # dt: datetime = date_parse(
         #   header["date"]) if len(header["date"]) > 0 else datetime.utcnow()
 
@@ -424,23 +444,26 @@ class DTN7Backend(Backend):
         message_hash = get_article_hash(
             source=dtn_args["source"], destination=dtn_args["destination"], data=dtn_payload
         )
-        self.logger.debug(f"Sending article to DB, got message hash: {message_hash}")
+        self.logger.debug("Sending article to DB, got message hash: %s", message_hash)
         dtn_msg: DTNMessage = await DTNMessage.create(
             **dtn_args, data=dtn_payload, hash=message_hash
         )
-        self.logger.debug(f"Created entry in DTNd message spool with id {dtn_msg.id}")
-        self.logger.debug(f"Sending message {dtn_msg.id} to dtnd")
+        self.logger.debug("Created entry in DTNd message spool with id %s", dtn_msg.id)
+        self._schedule_expiry(dtn_msg.created_at + timedelta(milliseconds=dtn_msg.lifetime))
+        self.logger.debug("Sending message %s to dtnd", dtn_msg.id)
 
         await self._send_to_dtnd(dtn_args=dtn_args, dtn_payload=dtn_payload, hash_=message_hash)
 
     async def _init_db(self) -> None:
-        await Tortoise.init(
-            db_url=config["backend"]["db_url"], modules={"models": ["backend.dtn7sqlite.models"]}
-        )
+        await Tortoise.init(config=db_config(config["backend"]["db_url"]))
+        connection: BaseDBAsyncClient = Tortoise.get_connection("default")
+        # bring tables of existing DBs up to date before tortoise creates any missing tables and
+        # indexes, which might refer to columns only added by a migration
+        await migrate(connection, fresh=await is_fresh_db(connection))
         # generate schema only if table does not exist yet
         await Tortoise.generate_schemas(safe=True)
 
-        self.logger.info(f"Connected to database {config['backend']['db_url']}")
+        self.logger.info("Connected to database %s", config["backend"]["db_url"])
 
     async def _ws_runner(self) -> None:
         """
@@ -449,8 +472,10 @@ class DTN7Backend(Backend):
         """
 
         self.logger.debug(
-            "Setting up WS connection to dtnd:"
-            f" ws://{config['dtnd']['host']}:{config['dtnd']['port']}{config['dtnd']['ws_path']}"
+            "Setting up WS connection to dtnd: ws://%s:%s%s",
+            config["dtnd"]["host"],
+            config["dtnd"]["port"],
+            config["dtnd"]["ws_path"],
         )
         first_connect: bool = True
 
@@ -464,24 +489,24 @@ class DTN7Backend(Backend):
                 first_connect = False
 
                 await self._ws_client.send("/data")
-                for gn in self._group_names:
+                for gn in self._newsgroups.names:
                     await self._ws_client.send(f"/subscribe {group_name_to_endpoint(gn)}")
                 self.logger.info(
-                    f"WS connection established. Subscribed to: {[gn for gn in self._group_names]}"
+                    "WS connection established. Subscribed to: %s", self._newsgroups.names
                 )
 
                 ####################################################################################
                 async for ws_data in self._ws_client:
                     if isinstance(ws_data, str):
                         self.logger.debug(
-                            "Received WebSocket data from DTNd, probably a status message:"
-                            f" {ws_data}"
+                            "Received WebSocket data from DTNd, probably a status message: %s",
+                            ws_data,
                         )
                         # probably a status code, so check if it's an error that should be logged
                         if ws_data.startswith("4"):
-                            self.logger.info(f"User caused an error: {ws_data}")
+                            self.logger.info("User caused an error: %s", ws_data)
                         if ws_data.startswith("5"):
-                            self.logger.error(f"Server-side error: {ws_data}")
+                            self.logger.error("Server-side error: %s", ws_data)
 
                     elif isinstance(ws_data, bytes):
                         self.logger.debug(
@@ -497,24 +522,10 @@ class DTN7Backend(Backend):
                             self.logger.exception(err)
                             raise err
 
-                        try:
-                            self.logger.debug("Starting data handler.")
-                            _handle_task: Task = self._loop.create_task(
-                                self._handle_backchannel_data(ws_struct=ws_dict)
-                            )
-                            self._background_tasks.add(_handle_task)
-                            _handle_task.add_done_callback(self._background_tasks.discard)
-                            # await self._handle_backchannel_data(ws_struct=ws_dict)
-
-                            # solve latency issues with a queue!
-                            # https://stackoverflow.com/a/52615705
-
-                        except Exception as e:  # noqa E722
-                            self.logger.exception(e)
-                            self.logger.warning(
-                                "Ignoring the previous error and continuing processing."
-                            )
-                            # raise Exception(e)
+                        # blocks while the queue is full, which stops us from reading any
+                        # further data off the WS until the workers have caught up
+                        self.logger.debug("Queueing data for back-channel workers.")
+                        await self._backchannel_queue.put(ws_dict)
 
                     else:
                         raise ValueError("Handler received unrecognizable data.")
@@ -546,20 +557,22 @@ class DTN7Backend(Backend):
             # register and subscribe to all newsgroup endpoints
             self.logger.debug("Contacting DTNs REST interface")
             try:
-                self._rest_client = DTNRESTClient(host=f"http://{host}", port=port)
+                self._rest_client = await AsyncDTNRESTClient.connect(
+                    host=f"http://{host}", port=port, executor=self._rest_executor
+                )
                 self.logger.info("Successfully contacted REST interface")
             except ConnectionError:
                 if retries >= max_retries:
                     self.logger.error(
-                        "DTNd REST interface not available, retrying in"
-                        f" {config['backoff']['reconnection_pause']} seconds."
+                        "DTNd REST interface not available, retrying in %s seconds.",
+                        config["backoff"]["reconnection_pause"],
                     )
                     await asyncio.sleep(config["backoff"]["reconnection_pause"])
                     retries = 0
 
                 new_sleep: int = (retries**2) * initial_wait
                 self.logger.warning(
-                    f"DTNd REST interface not available, waiting for {new_sleep} seconds"
+                    "DTNd REST interface not available, waiting for %d seconds", new_sleep
                 )
                 await asyncio.sleep(new_sleep)
                 retries += 1
@@ -575,86 +588,98 @@ class DTN7Backend(Backend):
         while True:
             self.logger.debug("REST runner task reporting for duty")
             try:
-                if len(self._rest_client.info) > 0:
+                if len(await self._rest_client.info()) > 0:
                     pass
             except Exception as e:  # noqa E722
-                self.logger.warning(f"There seems to be a problem with the REST connection: {e}")
+                self.logger.warning("There seems to be a problem with the REST connection: %s", e)
+                # drop the stale client, otherwise the connector has nothing to do
+                self._rest_client = None
                 await self._rest_connector()
             self.logger.debug(
-                "REST runner task going to sleep for"
-                f" {config['backend']['rest_check'] / 1000} seconds"
+                "REST runner task going to sleep for %s seconds",
+                config["backend"]["rest_check"] / 1000,
             )
             await asyncio.sleep(config["backend"]["rest_check"] / 1000)
 
-    async def _handle_backchannel_data(self, ws_struct: dict):
-        self.logger.debug("Mapping BP7 to NNTP fields")
-
+    def _decode_backchannel_data(self, ws_struct: dict) -> Optional[Tuple[dict, str]]:
+        """
+        Maps a bundle received through the WS back-channel to the keyword arguments of an Article.
+        Returns the article data along with the spool hash of the article, or None if the article
+        can't be stored on this server. Runs in a thread of the decode executor, so it must not
+        touch anything but the newsgroup registry, which is only read here.
+        """
         # map BP7 to NNTP fields MAPPING
         sender: str = _bp7sender_to_nntpfrom(ws_struct["src"])
-        self.logger.debug(f"      Sender: {ws_struct['src']} -> {sender}")
-
         group_name: str = ws_struct["dst"].replace("dtn://", "").replace("//", "").split("/")[0]
-        self.logger.debug(f"  Group Name: {ws_struct['dst']} -> {group_name}")
-
         dt: datetime = from_dtn_timestamp(int(ws_struct["bid"].rsplit(sep="-", maxsplit=2)[-2]))
-        self.logger.debug(f"    Datetime: {ws_struct['bid']} -> {dt}")
-
         msg_id: str = _bundleid_to_messageid(ws_struct["bid"])
-        self.logger.debug(f"  Message ID: {ws_struct['bid']} -> {msg_id}")
-
-        msg_data: dict = cbor2.loads(ws_struct["data"])
-
-        self.logger.debug(f"Creating article entry for {msg_id} in newsgroup DB")
-        article_group = await Newsgroup.get_or_none(name=group_name)
-        # TODO: Error handling in case group does not exist
-
-        if msg_data.get("compressed", False):
-            self.logger.debug(f"BEFORE DECOMPRESSING {msg_data['body']}")
-            msg_data["body"] = zlib.decompress(msg_data["body"]).decode()
-            self.logger.debug(f"AFTER DECOMPRESSING {msg_data['body']}")
-        try:
-            msg: Article = await Article.create(
-                newsgroup=article_group,
-                from_=sender,
-                subject=msg_data["subject"],
-                created_at=dt,
-                message_id=msg_id,
-                body=msg_data["body"],
-                references=msg_data["references"],
-            )
-            self.logger.info(
-                f"Created new entry with id {msg.id} in articles table, subject:"
-                f" '{msg_data['subject']}'"
+        # runs for every bundle of the back-channel, so the mapping is only logged when it is seen
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Mapped BP7 to NNTP fields: %s -> %s, %s -> %s, %s -> %s / %s",
+                ws_struct["src"],
+                sender,
+                ws_struct["dst"],
+                group_name,
+                ws_struct["bid"],
+                dt,
+                msg_id,
             )
-        except IntegrityError as e:
+
+        article_group: Optional[Newsgroup] = self._newsgroups.get(group_name)
+        if article_group is None:
             self.logger.error(
-                f"Got IntegrityError from ORM: {e.__str__()}. No new article entry was created for"
-                f" article with message-id {msg_id}."
-            )
-        except Exception as e:  # noqa E722
-            self.logger.exception(e)
-        else:
-            # remove message from spool HASHING
-            article_hash = get_article_hash(
-                source=ws_struct["src"],
-                destination=ws_struct["dst"],
-                data=msg_data,
+                "Newsgroup '%s' is not carried by this server, discarding %s.", group_name, msg_id
             )
+            return None
+
+        msg_data: dict = cbor2.loads(ws_struct["data"])
+        compressed: Optional[bytes] = None
+        if msg_data.get("compressed", False):
+            compressed = msg_data["body"]
+            msg_data["body"] = zlib.decompress(compressed).decode()
+
+        # the spool entry was hashed over the uncompressed article, see save_article HASHING
+        article_hash: str = get_article_hash(
+            source=ws_struct["src"],
+            destination=ws_struct["dst"],
+            data=msg_data,
+        )
+        article_data: dict = {
+            "newsgroup": article_group,
+            "from_": sender,
+            "subject": msg_data["subject"],
+            "created_at": dt,
+            "message_id": msg_id,
+            "body": msg_data["body"],
+            "references": msg_data["references"],
+        }
+        return compress_body(add_overview_stats(article_data), compressed=compressed), article_hash
+
+    async def _commit_backchannel_articles(self, batch: List[Tuple[dict, str]]) -> None:
+        """
+        Group commit of back-channel articles: writes all articles of the batch and removes their
+        entries from the dtnd message spool in one transaction.
+        """
+        articles: List[dict] = [article_data for article_data, _ in batch]
+        stored, deleted = await store_articles_and_clear_spool(
+            articles=articles,
+            spool_hashes=[article_hash for _, article_hash in batch],
+            newsgroups=self._newsgroups,
+        )
+        self.logger.info(
+            "Committed %d new articles from back-channel batch of %d, removed %d spool entries",
+            stored,
+            len(batch),
+            deleted,
+        )
+        if stored < len(batch):
             self.logger.debug(
-                f"Removing corresponding entry from dtnd message spool: {article_hash}"
+                "%d articles of the batch were already in the DB", len(batch) - stored
             )
-            del_cnt: int = await DTNMessage.filter(hash=article_hash).delete()
-            if del_cnt == 1:
-                self.logger.info(f"Removed spool entry {article_hash}")
-            elif del_cnt == 0:
-                self.logger.debug(
-                    f"Article seems to have remote origin, no spool entry removed for {msg_id}."
-                )
-            else:
-                self.logger.error(
-                    f"Something went wrong deleting the entry. {del_cnt} entries were deleted"
-                    " instead of 1"
-                )
+        if stored > 0 and config["usenet"]["expiry_time"] != 0:
+            oldest: datetime = min(article_data["created_at"] for article_data in articles)
+            self._schedule_expiry(oldest + timedelta(milliseconds=config["usenet"]["expiry_time"]))
 
     def _nntpfrom_to_bp7source(self, from_: str) -> str:
         if "@" not in from_:
@@ -674,18 +699,44 @@ class DTN7Backend(Backend):
         return f"{node_id}mail/{email_domain}/{email_name}"
 
     async def _janitor(self) -> None:
-        """continuous task that expires articles in database"""
-        while True:
-            self.logger.debug("Janitor task reporting for duty")
+        """expires articles and stale spool entries in database, run by the expiry scheduler"""
+        self.logger.debug("Janitor task reporting for duty")
+        stats: JanitorStats = JanitorStats()
+        chunk_size: int = max(1, config["janitor"]["chunk_size"])
+
+        if config["usenet"]["expiry_time"] != 0:
+            cutoff_dt: datetime = _expiry_cutoff()
+            if await expire_articles(cutoff_dt, chunk_size, stats, self._newsgroups) > 0:
+                self._article_cache.expire(cutoff_dt)
+        await expire_spool(datetime.now(timezone.utc), chunk_size, stats)
+        if stats.articles + stats.spool > 0:
+            await incremental_vacuum(config["janitor"]["vacuum_pages"], stats)
+
+        stats.duration = time.perf_counter() - stats.started
+        if stats.articles + stats.spool > 0:
+            self.logger.info("Janitor %s", stats)
+        else:
+            self.logger.debug("Janitor %s", stats)
+        self.logger.debug("Article cache: %s", self._article_cache)
 
-            if config["usenet"]["expiry_time"] != 0:
-                del_nr: int = await _delete_expired_articles()
-                self.logger.debug(f"Found and deleted {del_nr} expired articles")
+    async def _next_expiries(self) -> List[Optional[datetime]]:
+        deadlines: List[Optional[datetime]] = [await next_spool_expiry()]
+        if config["usenet"]["expiry_time"] != 0:
+            deadlines.append(await next_article_expiry(config["usenet"]["expiry_time"]))
+        return deadlines
 
-            self.logger.debug(
-                f"Janitor task going to sleep for {config['janitor']['sleep'] / 1000} seconds"
-            )
-            await asyncio.sleep(config["janitor"]["sleep"] / 1000)
+    def _schedule_expiry(self, deadline: datetime) -> None:
+        # rows written before the scheduler is up are found when it seeds itself from the DB
+        if self._expiry is not None:
+            self._expiry.schedule(deadline)
+
+    @property
+    def newsgroups(self) -> NewsgroupRegistry:
+        return self._newsgroups
+
+    @property
+    def article_cache(self) -> ArticleCache:
+        return self._article_cache
 
     @property
     def available_commands(self) -> List[str]:
@@ -9,13 +9,21 @@ from logger import global_logger
 logger: Logger = global_logger()
 
 config_defaults = {
-    "backend": {"db_url": "sqlite://db.sqlite3"},
+    "backend": {
+        "db_url": "sqlite://db.sqlite3",
+        "rest_check": 20000,
+        "fetch_chunk_size": 500,
+        "article_cache_size": 16777216,
+        "compress_bodies": False,
+        "sqlite": {"profile": "throughput", "readers": 2},
+    },
     "dtnd": {
         "host": "127.0.0.1",
         "node_id": "dtn://n1/",
         "port": 3000,
         "rest_path": "",
         "ws_path": "/ws",
+        "rest_workers": 4,
     },
     "backoff": {
         "initial_wait": 0.1,
@@ -23,6 +31,7 @@ config_defaults = {
         "reconnection_pause": 300,
         "constant_wait": 0.75,
     },
+    "spool": {"page_size": 100, "window": 4, "rate": 0},
     "bundles": {"lifetime": 86400000, "delivery_notification": False, "compress_body": False},
     "usenet": {
         "expiry_time": 2419200000,
@@ -33,8 +42,27 @@ config_defaults = {
             "monntpy.offtopic",
         ],
     },
+    "ingest": {"concurrency": 4, "batch_size": 100, "progress_interval": 500},
+    "backchannel": {
+        "queue_size": 1000,
+        "workers": 4,
+        "commit_max_items": 100,
+        "commit_interval": 50,
+    },
+    "janitor": {"batch_window": 60000, "chunk_size": 1000, "vacuum_pages": 0},
 }
 
+
+def _merge_defaults(cfg: dict, defaults: dict = config_defaults) -> dict:
+    # settings added in newer versions may be missing from existing config.toml files
+    for key, value in defaults.items():
+        if isinstance(value, dict):
+            _merge_defaults(cfg.setdefault(key, {}), value)
+        else:
+            cfg.setdefault(key, value)
+    return cfg
+
+
 try:
     toml_path: str = str(Path(__file__).resolve().parent / "config.toml")
     config = load(toml_path)
@@ -43,9 +71,11 @@ try:
     for k1, k2 in [
         ("bundles", "lifetime"),
         ("usenet", "expiry_time"),
-        ("janitor", "sleep"),
+        ("janitor", "batch_window"),
         ("backend", "rest_check"),
     ]:
+        if k2 not in config.get(k1, {}):
+            continue
         try:
             config[k1][k2] = parse(config[k1][k2]) * 1000
         except TypeError:
@@ -53,6 +83,8 @@ try:
             # will throw a TypeError
             config[k1][k2] = config_defaults[k1][k2]
 
+    config = _merge_defaults(config)
+
 except FileNotFoundError:
     logger.error("File 'config.toml' not found in backend root directory. Using defaults.")
     config = config_defaults
@@ -0,0 +1,133 @@
+"""
+Connection settings of the SQLite DB.
+
+Tortoise's SQLite client runs every keyword argument in the credentials of a connection as a
+pragma when it opens the connection, so the pragmas of [backend.sqlite] are passed that way and
+apply to every connection the backend opens.
+
+An SQLite DB is opened with one writer connection and a pool of read-only reader connections.
+Tortoise's SQLite client runs all queries of a connection one after the other, and a transaction
+holds the connection until it ends, so with a single connection every NNTP read would queue up
+behind a running ingest batch or janitor run. In WAL mode, readers see the last committed state of
+the DB while a write transaction is running, so ReadWriteRouter sends all reads to the readers and
+all writes, and thus all transactions, to the one writer, where they are serialized.
+"""
+
+from copy import deepcopy
+from logging import Logger
+from typing import Dict, List, Optional, Type, Union
+
+from tortoise import Model
+from tortoise.backends.base.config_generator import expand_db_url
+from tortoise.connection import connections
+
+from backend.dtn7sqlite.config import config
+from logger import global_logger
+
+logger: Logger = global_logger()
+
+PragmaValue = Union[str, int]
+
+# "throughput": WAL, so readers never wait for the ingest writer and vice versa, with commits only
+#   synced at checkpoints. A power loss may lose the last transactions, but never corrupts the DB,
+#   and lost articles are simply ingested again from the dtnd.
+# "durability": WAL, but every commit is synced to disk and no memory-mapped I/O is used, for
+#   nodes on flaky storage. Commits are noticeably slower, especially on SD cards.
+SQLITE_PROFILES: Dict[str, Dict[str, PragmaValue]] = {
+    "throughput": {
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 67108864,
+        "cache_size": -16384,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "durability": {
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -2000,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+}
+DEFAULT_PROFILE: str = "throughput"
+
+# connection names of the writer and readers
+WRITER: str = "default"
+READER_PREFIX: str = "reader"
+
+
+def sqlite_pragmas(sqlite_cfg: dict) -> Dict[str, PragmaValue]:
+    """
+    Resolves the pragmas to apply from a [backend.sqlite] config section: the pragmas of the
+    selected profile, overridden by any pragma set explicitly in the section.
+
+    Args:
+        sqlite_cfg: the [backend.sqlite] config section
+
+    Returns:
+        pragma names mapped to their values
+    """
+    profile: str = sqlite_cfg.get("profile", DEFAULT_PROFILE)
+    if profile not in SQLITE_PROFILES:
+        logger.error("Unknown SQLite profile '%s', using '%s' instead", profile, DEFAULT_PROFILE)
+        profile = DEFAULT_PROFILE
+    pragmas: Dict[str, PragmaValue] = dict(SQLITE_PROFILES[profile])
+    pragmas.update({k: v for k, v in sqlite_cfg.items() if k in pragmas})
+    return pragmas
+
+
+def db_config(db_url: str) -> dict:
+    """
+    Builds the tortoise config for the DB at db_url. For an SQLite DB, the pragmas of
+    [backend.sqlite] are added and backend.sqlite.readers reader connections are set up next to
+    the writer, unless the DB is in-memory, where every connection would get a DB of its own.
+    """
+    sqlite_cfg: dict = config["backend"]["sqlite"]
+    writer: dict = expand_db_url(db_url)
+    connections_cfg: Dict[str, dict] = {WRITER: writer}
+    if writer["engine"] == "tortoise.backends.sqlite":
+        # auto_vacuum only takes effect if it is set before journal_mode on a fresh DB, so the
+        # pragmas go first
+        pragmas: Dict[str, PragmaValue] = sqlite_pragmas(sqlite_cfg)
+        writer["credentials"] = {
+            **pragmas,
+            **{k: v for k, v in writer["credentials"].items() if k not in pragmas},
+        }
+        if writer["credentials"]["file_path"] != ":memory:":
+            for i in range(sqlite_cfg["readers"]):
+                reader: dict = deepcopy(writer)
+                reader["credentials"]["query_only"] = "ON"
+                connections_cfg[f"{READER_PREFIX}{i}"] = reader
+    return {
+        "connections": connections_cfg,
+        "apps": {"models": {"models": ["backend.dtn7sqlite.models"], "default_connection": WRITER}},
+        "routers": [ReadWriteRouter],
+    }
+
+
+class ReadWriteRouter:
+    """
+    Tortoise router sending writes to the writer connection and spreading reads over the reader
+    connections round-robin. Without readers, reads go to the writer as well.
+
+    Queries run with an explicit connection, e.g. inside in_transaction(WRITER), are not routed.
+    """
+
+    def __init__(self):
+        self._readers: List[str] = sorted(
+            name for name in connections.db_config if name.startswith(READER_PREFIX)
+        )
+        self._next: int = 0
+
+    def db_for_read(self, model: Type[Model]) -> Optional[str]:
+        if len(self._readers) == 0:
+            return WRITER
+        self._next = (self._next + 1) % len(self._readers)
+        return self._readers[self._next]
+
+    def db_for_write(self, model: Type[Model]) -> Optional[str]:
+        return WRITER
@@ -0,0 +1,339 @@
+import asyncio
+import time
+import zlib
+from asyncio import AbstractEventLoop, Queue, Task
+from concurrent.futures import Executor
+from logging import Logger
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import cbor2
+from py_dtn7 import Bundle, from_dtn_timestamp
+from tortoise import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
+
+from backend.dtn7sqlite.db import WRITER
+from backend.dtn7sqlite.models import Article, DTNMessage, Newsgroup, Overview
+from backend.dtn7sqlite.registry import NewsgroupRegistry
+from backend.dtn7sqlite.utils import (
+    _bp7sender_to_nntpfrom,
+    _bundleid_to_messageid,
+    add_overview_stats,
+    compress_body,
+)
+
+
+class IngestStats:
+    """
+    Progress counters of a running (or finished) ingest pipeline.
+    """
+
+    def __init__(self, total: int):
+        self.total: int = total
+        self.downloaded: int = 0
+        self.decoded: int = 0
+        self.stored: int = 0
+        self.duplicates: int = 0
+        self.failed: int = 0
+        self.dropped: int = 0
+        self.started: float = time.monotonic()
+        self.finished: Optional[float] = None
+
+    @property
+    def processed(self) -> int:
+        return self.decoded + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        end: float = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.processed}/{self.total} bundles processed ({self.stored} stored,"
+            f" {self.duplicates} duplicates, {self.failed} failed, {self.dropped} dropped) in"
+            f" {self.elapsed:.1f}s, {self.rate:.1f} bundles/s"
+        )
+
+
+def decode_bundle(bundle_id: str, raw: bytes, newsgroups: Mapping[str, Newsgroup]) -> dict:
+    """
+    Maps a CBOR encoded bundle downloaded from the dtnd to the keyword arguments of an Article.
+    """
+    bundle: Bundle = Bundle.from_cbor(raw)
+
+    # map BP7 to NNTP MAPPING
+    group_name: str = (
+        bundle.destination.replace("dtn://", "").replace("//", "").replace("/~news", "")
+    )
+    data: dict = cbor2.loads(bundle.payload_block.data)
+    compressed: Optional[bytes] = None
+    if data.get("compressed", False):
+        compressed = data["body"]
+        data["body"] = zlib.decompress(compressed).decode()
+
+    article_data: dict = add_overview_stats(
+        {
+            "newsgroup": newsgroups[group_name],
+            "from_": _bp7sender_to_nntpfrom(sender=bundle.source),
+            "subject": data["subject"],
+            "created_at": from_dtn_timestamp(int(bundle.timestamp)),
+            "message_id": _bundleid_to_messageid(bundle_id),
+            "body": data["body"],
+            "references": data["references"],
+        }
+    )
+    return compress_body(article_data, compressed=compressed)
+
+
+def overview_row(article_data: dict, article_id: int) -> Overview:
+    """
+    Builds the overview row of a decoded article, see add_overview_stats.
+    """
+    return Overview(
+        article_id=article_id,
+        newsgroup_id=article_data["newsgroup"].id,
+        number=article_data["number"],
+        subject=article_data["subject"],
+        from_=article_data["from_"],
+        created_at=article_data["created_at"],
+        message_id=article_data["message_id"],
+        references=article_data.get("references"),
+        byte_count=article_data["byte_count"],
+        line_count=article_data["line_count"],
+    )
+
+
+async def _new_articles(articles: List[dict], connection: BaseDBAsyncClient) -> List[dict]:
+    """
+    Drops the articles whose message-id is already in the DB or earlier in the batch. Run in the
+    writer transaction that inserts the batch, so nothing can be stored in between.
+    """
+    known: Set[str] = set(
+        await Article.filter(message_id__in=[a["message_id"] for a in articles])
+        .using_db(connection)
+        .values_list("message_id", flat=True)
+    )
+    new_articles: List[dict] = []
+    for article_data in articles:
+        if article_data["message_id"] not in known:
+            known.add(article_data["message_id"])
+            new_articles.append(article_data)
+    return new_articles
+
+
+async def _bulk_insert(
+    articles: List[dict], newsgroups: NewsgroupRegistry, connection: BaseDBAsyncClient
+) -> List[dict]:
+    # duplicates are dropped before numbering, so every number handed out is actually used and
+    # group numbering stays dense
+    new_articles: List[dict] = await _new_articles(articles, connection)
+    if len(new_articles) == 0:
+        return new_articles
+    high_water: Dict[int, int] = newsgroups.assign_numbers(new_articles)
+    await Article.bulk_create(
+        [Article(**article_data) for article_data in new_articles], using_db=connection
+    )
+    # executemany doesn't report the ids of the new rows, they're looked up by the unique index
+    ids: Dict[str, int] = dict(
+        await Article.filter(message_id__in=[a["message_id"] for a in new_articles])
+        .using_db(connection)
+        .values_list("message_id", "id")
+    )
+    await Overview.bulk_create(
+        [
+            overview_row(article_data, ids[article_data["message_id"]])
+            for article_data in new_articles
+        ],
+        using_db=connection,
+    )
+    for group_id, number in high_water.items():
+        await Newsgroup.filter(id=group_id).using_db(connection).update(high_water=number)
+    return new_articles
+
+
+async def store_articles(articles: List[dict], newsgroups: NewsgroupRegistry) -> int:
+    """
+    Commits a batch of decoded articles in a single transaction with one executemany INSERT.
+    Articles whose message-id is already in the DB are skipped instead of aborting the whole
+    batch. Article numbers are assigned and the group watermarks updated along the way.
+
+    Returns:
+        number of articles actually written to the DB
+    """
+    try:
+        async with in_transaction(WRITER) as connection:
+            stored: List[dict] = await _bulk_insert(articles, newsgroups, connection)
+    except Exception:  # noqa E722
+        newsgroups.release_numbers(articles)
+        raise
+    newsgroups.articles_added(stored)
+    return len(stored)
+
+
+async def store_articles_and_clear_spool(
+    articles: List[dict], spool_hashes: List[str], newsgroups: NewsgroupRegistry
+) -> Tuple[int, int]:
+    """
+    Like store_articles, but also removes the spool entries of articles that made it back to us
+    through the dtnd, all in the same transaction.
+
+    Returns:
+        number of articles written to the DB and number of spool entries deleted
+    """
+    try:
+        async with in_transaction(WRITER) as connection:
+            stored: List[dict] = await _bulk_insert(articles, newsgroups, connection)
+            deleted: int = (
+                await DTNMessage.filter(hash__in=spool_hashes).using_db(connection).delete()
+            )
+    except Exception:  # noqa E722
+        newsgroups.release_numbers(articles)
+        raise
+    newsgroups.articles_added(stored)
+    return len(stored), deleted
+
+
+class IngestPipeline:
+    """
+    Bounded-concurrency pipeline for ingesting bundles from the dtnd bundle store:
+
+        bundle ids -> N fetchers -> M decoders (executor threads) -> batched DB writer
+
+    The queues between the stages are bounded, so a slow DB pushes back on the decoders and slow
+    decoders push back on the fetchers. Only a few batches of articles are held in memory at any
+    time, regardless of the size of the bundle store.
+
+    Decoding a bundle (CBOR, zlib) is CPU-bound, so the decoders run it in executor, which keeps
+    the event loop free to serve clients while a large bundle store is ingested.
+    """
+
+    def __init__(
+        self,
+        download: Callable[[str], Awaitable[bytes]],
+        newsgroups: NewsgroupRegistry,
+        logger: Logger,
+        executor: Executor,
+        concurrency: int,
+        decoders: int,
+        batch_size: int,
+        progress_interval: int,
+    ):
+        self._download = download
+        self._newsgroups = newsgroups
+        self._logger = logger
+        self._executor: Executor = executor
+        self._concurrency: int = max(1, concurrency)
+        self._decoders: int = max(1, decoders)
+        self._batch_size: int = max(1, batch_size)
+        self._progress_interval: int = progress_interval
+        self._id_queue: Queue = Queue()
+        self._decode_queue: Queue = Queue(maxsize=2 * self._concurrency)
+        self._write_queue: Queue = Queue(maxsize=2 * self._batch_size)
+        self.stats: IngestStats = IngestStats(total=0)
+
+    async def run(self, bundle_ids: Iterable[str]) -> IngestStats:
+        for bundle_id in bundle_ids:
+            self._id_queue.put_nowait(bundle_id)
+        self.stats = IngestStats(total=self._id_queue.qsize())
+        self._logger.info(
+            "Ingesting %d bundles with %d concurrent fetchers", self.stats.total, self._concurrency
+        )
+
+        fetchers: List[Task] = [
+            asyncio.create_task(self._fetcher()) for _ in range(self._concurrency)
+        ]
+        decoders: List[Task] = [asyncio.create_task(self._decoder()) for _ in range(self._decoders)]
+        writer: Task = asyncio.create_task(self._writer())
+        try:
+            await asyncio.gather(*fetchers)
+            for _ in decoders:
+                await self._decode_queue.put(None)
+            await asyncio.gather(*decoders)
+            await self._write_queue.put(None)
+            await writer
+        finally:
+            for task in fetchers + decoders + [writer]:
+                task.cancel()
+
+        self.stats.finished = time.monotonic()
+        self._logger.info("Ingest finished: %s", self.stats)
+        return self.stats
+
+    async def _fetcher(self) -> None:
+        while not self._id_queue.empty():
+            bundle_id: str = self._id_queue.get_nowait()
+            try:
+                raw: bytes = await self._download(bundle_id)
+            except Exception as e:  # noqa E722
+                self.stats.failed += 1
+                self._logger.error("Bundle with ID %s could not be downloaded: %s", bundle_id, e)
+                self._report_progress()
+                continue
+            self.stats.downloaded += 1
+            await self._decode_queue.put((bundle_id, raw))
+
+    async def _decoder(self) -> None:
+        loop: AbstractEventLoop = asyncio.get_running_loop()
+        while True:
+            item: Optional[tuple] = await self._decode_queue.get()
+            if item is None:
+                break
+            bundle_id, raw = item
+            try:
+                article_data: dict = await loop.run_in_executor(
+                    self._executor, decode_bundle, bundle_id, raw, self._newsgroups
+                )
+            except Exception as e:  # noqa E722
+                self.stats.failed += 1
+                self._logger.error("Bundle with ID %s could not be deserialized: %s", bundle_id, e)
+            else:
+                self.stats.decoded += 1
+                await self._write_queue.put(article_data)
+            self._report_progress()
+
+    async def _writer(self) -> None:
+        batch: List[dict] = []
+        while True:
+            article_data: Optional[dict] = await self._write_queue.get()
+            if article_data is not None:
+                batch.append(article_data)
+            if len(batch) >= self._batch_size or (article_data is None and len(batch) > 0):
+                await self._flush(batch)
+                batch = []
+            if article_data is None:
+                break
+
+    async def _flush(self, batch: List[dict]) -> None:
+        try:
+            stored: int = await store_articles(batch, newsgroups=self._newsgroups)
+            self.stats.stored += stored
+            self.stats.duplicates += len(batch) - stored
+            self._logger.debug("Committed batch of %d ingested articles", stored)
+        except Exception as e:  # noqa E722
+            self.stats.dropped += len(batch)
+            self._logger.error(
+                (
+                    "Something went very wrong committing a batch of ingested articles from the"
+                    " dtnd. %d were not stored in the server DB! Error: %s"
+                ),
+                len(batch),
+                e,
+            )
+
+    def _report_progress(self) -> None:
+        if self._progress_interval > 0 and self.stats.processed % self._progress_interval == 0:
+            self._logger.info("Ingest progress: %s", self.stats)
@@ -0,0 +1,320 @@
+"""
+Expiry of old articles and stale spool entries.
+
+Everything is deleted in chunks of janitor.chunk_size rows, each in a transaction of its own, with
+the event loop getting a turn in between. That way a janitor run after a long downtime never holds
+the writer connection for more than one chunk, and ingest and back-channel commits interleave with
+the expiry instead of waiting for all of it.
+
+Janitor runs are not polled for, ExpiryScheduler starts one whenever the next article or spool
+entry is due.
+"""
+
+import asyncio
+import heapq
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from logging import Logger
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+from tortoise import BaseDBAsyncClient, Tortoise
+from tortoise.transactions import in_transaction
+
+from backend.dtn7sqlite.db import WRITER
+from backend.dtn7sqlite.models import Article
+from backend.dtn7sqlite.registry import NewsgroupRegistry
+from logger import global_logger
+
+logger: Logger = global_logger()
+
+# the system clock of a node without RTC may jump when it gets synced, so deadlines are never slept
+# on for longer than this many seconds without checking the clock again
+_MAX_SLEEP: float = 3600.0
+
+# a spool entry is stale once the lifetime of its bundle has passed, the dtnd has dropped the
+# bundle by then and resending it would only yield a bundle that expires right away
+_DELETE_STALE_SPOOL: str = (
+    'DELETE FROM "dtn_spool" WHERE "id" IN (SELECT "id" FROM "dtn_spool"'
+    ' WHERE JULIANDAY("created_at") + "lifetime" / 86400000.0 < JULIANDAY(?) LIMIT ?)'
+)
+_NEXT_STALE_SPOOL: str = (
+    'SELECT MIN(JULIANDAY("created_at") + "lifetime" / 86400000.0) AS "deadline" FROM "dtn_spool"'
+)
+# julian day number of the unix epoch
+_JULIAN_UNIX_EPOCH: float = 2440587.5
+
+T = TypeVar("T")
+
+# (newsgroup id, number) of every deleted article and the lowest number left in every affected
+# group, None if the group is empty now
+ExpiredArticles = Tuple[List[Tuple[int, int]], Dict[int, Optional[int]]]
+
+
+class JanitorStats:
+    """
+    Metrics of a single janitor run.
+    """
+
+    def __init__(self):
+        self.articles: int = 0
+        self.spool: int = 0
+        self.vacuumed_pages: int = 0
+        self.transactions: int = 0
+        # seconds spent waiting for the writer connection, i.e. for other transactions to finish
+        self.lock_wait: float = 0.0
+        self.started: float = time.perf_counter()
+        self.duration: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"expired {self.articles} articles and {self.spool} spool entries, vacuumed"
+            f" {self.vacuumed_pages} pages in {self.transactions} transactions, took"
+            f" {self.duration:.3f}s of which {self.lock_wait:.3f}s waiting for the DB lock"
+        )
+
+
+async def _in_write_transaction(
+    stats: JanitorStats, work: Callable[[BaseDBAsyncClient], Awaitable[T]]
+) -> T:
+    wait_start: float = time.perf_counter()
+    async with in_transaction(WRITER) as connection:
+        stats.lock_wait += time.perf_counter() - wait_start
+        stats.transactions += 1
+        return await work(connection)
+
+
+async def _delete_expired_article_chunk(
+    connection: BaseDBAsyncClient, cutoff_dt: datetime, chunk_size: int
+) -> ExpiredArticles:
+    rows: List[Tuple[int, int, int]] = (
+        await Article.filter(created_at__lt=cutoff_dt)
+        .using_db(connection)
+        .order_by("created_at")
+        .limit(chunk_size)
+        .values_list("id", "newsgroup_id", "number")
+    )
+    if len(rows) == 0:
+        return [], {}
+    await Article.filter(id__in=[row[0] for row in rows]).using_db(connection).delete()
+
+    # articles expire by age, not by number, so the new low water mark has to be looked up. Each
+    # lookup is a single seek in the (newsgroup_id, number) index
+    low_water: Dict[int, Optional[int]] = {}
+    for group_id in set(row[1] for row in rows):
+        low_water[group_id] = (
+            await Article.filter(newsgroup_id=group_id)
+            .using_db(connection)
+            .order_by("number")
+            .first()
+            .values_list("number", flat=True)
+        )
+    return [(group_id, number) for _, group_id, number in rows], low_water
+
+
+async def _delete_stale_spool_chunk(
+    connection: BaseDBAsyncClient, now: datetime, chunk_size: int
+) -> int:
+    deleted, _ = await connection.execute_query(_DELETE_STALE_SPOOL, [now.isoformat(), chunk_size])
+    return deleted
+
+
+async def _expire_chunked(
+    stats: JanitorStats,
+    chunk_size: int,
+    delete_chunk: Callable[[BaseDBAsyncClient], Awaitable[T]],
+    committed: Callable[[T], int],
+) -> int:
+    """
+    Runs delete_chunk in write transactions until a chunk comes up short. committed is handed the
+    result of every chunk right after its transaction has been committed and returns the number
+    of rows the chunk deleted.
+    """
+    deleted: int = 0
+    while True:
+        chunk: int = committed(await _in_write_transaction(stats, delete_chunk))
+        deleted += chunk
+        if chunk < chunk_size:
+            return deleted
+        # let queued writers and readers run before the next chunk
+        await asyncio.sleep(0)
+
+
+async def expire_articles(
+    cutoff_dt: datetime, chunk_size: int, stats: JanitorStats, newsgroups: NewsgroupRegistry
+) -> int:
+    """
+    Deletes all articles created before cutoff_dt, oldest first, chunk_size articles per
+    transaction. The watermarks of the affected groups in newsgroups are adjusted after every
+    chunk.
+
+    Returns:
+        number of deleted articles
+    """
+
+    def committed(expired: ExpiredArticles) -> int:
+        newsgroups.articles_expired(*expired)
+        return len(expired[0])
+
+    deleted: int = await _expire_chunked(
+        stats,
+        chunk_size,
+        lambda conn: _delete_expired_article_chunk(conn, cutoff_dt, chunk_size),
+        committed,
+    )
+    stats.articles += deleted
+    return deleted
+
+
+async def expire_spool(now: datetime, chunk_size: int, stats: JanitorStats) -> int:
+    """
+    Deletes all spool entries whose bundle lifetime has passed at now, chunk_size entries per
+    transaction.
+
+    Returns:
+        number of deleted spool entries
+    """
+    deleted: int = await _expire_chunked(
+        stats,
+        chunk_size,
+        lambda conn: _delete_stale_spool_chunk(conn, now, chunk_size),
+        lambda chunk: chunk,
+    )
+    stats.spool += deleted
+    return deleted
+
+
+async def _pragma(connection: BaseDBAsyncClient, name: str) -> int:
+    return (await connection.execute_query_dict(f"PRAGMA {name}"))[0][name]
+
+
+async def incremental_vacuum(max_pages: int, stats: JanitorStats) -> int:
+    """
+    Returns up to max_pages free pages of the DB file to the file system, all of them if max_pages
+    is 0. Only possible if the DB has auto_vacuum set to INCREMENTAL.
+
+    Returns:
+        number of pages freed
+    """
+    connection: BaseDBAsyncClient = Tortoise.get_connection(WRITER)
+    if await _pragma(connection, "auto_vacuum") != 2:
+        logger.debug(
+            "Skipping incremental vacuum, the DB has not been created or vacuumed with"
+            " auto_vacuum = INCREMENTAL"
+        )
+        return 0
+
+    free_before: int = await _pragma(connection, "freelist_count")
+    # every step of the pragma frees one page, but sqlite3 only steps statements through to the
+    # end when run as a script
+    await connection.execute_script(f"PRAGMA incremental_vacuum({int(max_pages)})")
+    freed: int = free_before - await _pragma(connection, "freelist_count")
+    stats.vacuumed_pages += freed
+    return freed
+
+
+async def next_article_expiry(expiry_time: int) -> Optional[datetime]:
+    """
+    Returns:
+        when the oldest article in the DB expires after expiry_time milliseconds, or None if there
+        are no articles
+    """
+    oldest: Optional[datetime] = (
+        await Article.all().order_by("created_at").first().values_list("created_at", flat=True)
+    )
+    return oldest + timedelta(milliseconds=expiry_time) if oldest is not None else None
+
+
+async def next_spool_expiry() -> Optional[datetime]:
+    """
+    Returns:
+        when the lifetime of the first spooled bundle ends, or None if the spool is empty
+    """
+    rows: List[dict] = await Tortoise.get_connection(WRITER).execute_query_dict(_NEXT_STALE_SPOOL)
+    if rows[0]["deadline"] is None:
+        return None
+    return datetime.fromtimestamp(
+        (rows[0]["deadline"] - _JULIAN_UNIX_EPOCH) * 86400, tz=timezone.utc
+    )
+
+
+class ExpiryScheduler:
+    """
+    Starts a janitor run exactly when the next article or spool entry expires, instead of waking
+    up periodically to look for expired rows.
+
+    Deadlines are kept in a min-heap. It is seeded from the DB at start and after every run, which
+    only takes two indexed queries for the next article and spool expiry. New rows are added with
+    schedule() as they are written, so a deadline earlier than all known ones wakes the scheduler
+    up right away.
+
+    Deadlines are rounded up to multiples of window seconds. Everything that expires within one
+    window is deleted by the same run, and the heap holds at most one entry per window.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[], Awaitable[None]],
+        next_deadlines: Callable[[], Awaitable[List[Optional[datetime]]]],
+        logger: Logger,
+        window: float,
+    ):
+        self._run = run
+        self._next_deadlines = next_deadlines
+        self._logger = logger
+        self._window: float = window
+        self._heap: List[float] = []
+        self._scheduled: Set[float] = set()
+        self._wakeup: asyncio.Event = asyncio.Event()
+
+    def schedule(self, deadline: datetime) -> None:
+        # like tortoise, take naive datetimes (e.g. from DTN timestamps) as UTC
+        if deadline.tzinfo is None:
+            deadline = deadline.replace(tzinfo=timezone.utc)
+        timestamp: float = deadline.timestamp()
+        if self._window > 0:
+            timestamp = math.ceil(timestamp / self._window) * self._window
+        if timestamp in self._scheduled:
+            return
+        heapq.heappush(self._heap, timestamp)
+        self._scheduled.add(timestamp)
+        if self._heap[0] == timestamp:
+            self._wakeup.set()
+
+    @property
+    def next_run(self) -> Optional[datetime]:
+        if len(self._heap) == 0:
+            return None
+        return datetime.fromtimestamp(self._heap[0], tz=timezone.utc)
+
+    async def _seed(self) -> None:
+        for deadline in await self._next_deadlines():
+            if deadline is not None:
+                self.schedule(deadline)
+        self._logger.debug("Next janitor run scheduled for %s", self.next_run)
+
+    async def run_forever(self) -> None:
+        await self._seed()
+        while True:
+            now: float = time.time()
+            if len(self._heap) > 0 and self._heap[0] <= now:
+                while len(self._heap) > 0 and self._heap[0] <= now:
+                    self._scheduled.discard(heapq.heappop(self._heap))
+                try:
+                    await self._run()
+                except Exception as e:  # noqa E722
+                    self._logger.error("Janitor run failed: %s", e)
+                    self._logger.exception(e)
+                    # the failed rows are still due, don't retry right away
+                    await asyncio.sleep(max(self._window, 1.0))
+                await self._seed()
+                continue
+
+            timeout: float = _MAX_SLEEP
+            if len(self._heap) > 0:
+                timeout = min(self._heap[0] - now, _MAX_SLEEP)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
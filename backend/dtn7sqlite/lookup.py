@@ -0,0 +1,79 @@
+"""
+Article lookups for the NNTP commands. Responses need the name of an article's newsgroup, which is
+taken from the newsgroup registry by the article's newsgroup_id instead of awaiting the relation,
+so every lookup is a single query on the article or overview table.
+"""
+
+from typing import List, Optional, Tuple, Type
+
+from tortoise.models import Model
+from tortoise.queryset import QuerySet
+
+from backend.dtn7sqlite.models import Article, Newsgroup
+from backend.dtn7sqlite.registry import NewsgroupRegistry
+
+
+class ArticlePointer:
+    """
+    Just enough of an article to identify it: used as the selected article of a connection, so
+    moving through a group never loads article bodies and a connection holds on to no more than
+    these four values.
+    """
+
+    __slots__ = ("id", "number", "message_id", "group_id")
+
+    # columns to fetch for a pointer
+    FIELDS: Tuple[str, ...] = ("id", "number", "message_id", "newsgroup_id")
+
+    def __init__(self, id: int, number: int, message_id: str, group_id: int):
+        self.id: int = id
+        self.number: int = number
+        self.message_id: str = message_id
+        self.group_id: int = group_id
+
+    @classmethod
+    def from_row(cls, row: dict) -> "ArticlePointer":
+        return cls(
+            id=row["id"],
+            number=row["number"],
+            message_id=row["message_id"],
+            group_id=row["newsgroup_id"],
+        )
+
+    def pointer(self) -> "ArticlePointer":
+        return ArticlePointer(self.id, self.number, self.message_id, self.group_id)
+
+    def __repr__(self):
+        return f"ArticlePointer <id={self.id} number={self.number} message_id={self.message_id}>"
+
+
+async def get_pointer(query: QuerySet[Article]) -> Optional[ArticlePointer]:
+    """
+    Fetches a pointer to the first article of query, without loading any other columns.
+    """
+    row: Optional[dict] = await query.first().values(*ArticlePointer.FIELDS)
+    return ArticlePointer.from_row(row) if row is not None else None
+
+
+async def group_name(newsgroups: NewsgroupRegistry, group_id: int) -> Optional[str]:
+    group: Optional[Newsgroup] = newsgroups.by_id(group_id)
+    if group is not None:
+        return group.name
+    # only happens for a group removed after the article was looked up
+    return await Newsgroup.filter(id=group_id).first().values_list("name", flat=True)
+
+
+async def get_article_values(
+    newsgroups: NewsgroupRegistry, fields: Tuple[str, ...], model: Type[Model] = Article, **filters
+) -> List[dict]:
+    """
+    Fetches the passed fields of the articles matching the filters, with the name of each article's
+    newsgroup added as "group_name". Overview fields are fetched from the overview table by passing
+    Overview as model.
+    """
+    rows: List[dict] = await model.filter(**filters).values(
+        *dict.fromkeys(fields + ("newsgroup_id",))
+    )
+    for row in rows:
+        row["group_name"] = await group_name(newsgroups, row["newsgroup_id"])
+    return rows
@@ -0,0 +1,158 @@
+"""
+Schema migrations for existing SQLite databases.
+
+Tortoise's generate_schemas only creates tables that don't exist yet, so any column or index added
+to an existing model has to be added to existing db.sqlite3 files here. The schema version of a DB
+is kept in SQLite's user_version pragma. A fresh DB gets the current schema from generate_schemas
+and is simply stamped with the latest version.
+
+To change the schema: change the model, then append a migration to MIGRATIONS that brings an
+existing DB of the previous version up to date.
+"""
+
+from logging import Logger
+from typing import Callable, List, Tuple
+
+from tortoise import BaseDBAsyncClient
+from tortoise.transactions import in_transaction
+
+from logger import global_logger
+
+logger: Logger = global_logger()
+
+
+async def _execute(connection: BaseDBAsyncClient, *statements: str) -> None:
+    # execute_script would implicitly COMMIT the surrounding transaction, so statements are run
+    # one by one
+    for statement in statements:
+        await connection.execute_query(statement)
+
+
+async def _add_article_numbers(connection: BaseDBAsyncClient) -> None:
+    # Existing articles keep their global id as article number, so newsreaders don't lose track
+    # of what they've already read. New articles are numbered densely per group from there on.
+    await _execute(
+        connection,
+        'ALTER TABLE "article" ADD COLUMN "number" INT',
+        'UPDATE "article" SET "number" = "id"',
+        (
+            'CREATE UNIQUE INDEX IF NOT EXISTS "uid_article_newsgroup_number" ON "article"'
+            ' ("newsgroup_id", "number")'
+        ),
+        'ALTER TABLE "newsgroup" ADD COLUMN "high_water" INT NOT NULL DEFAULT 0',
+        (
+            'UPDATE "newsgroup" SET "high_water" = COALESCE((SELECT MAX("number") FROM "article"'
+            ' WHERE "newsgroup_id" = "newsgroup"."id"), 0)'
+        ),
+    )
+
+
+async def _add_overview_stats(connection: BaseDBAsyncClient) -> None:
+    # same values as utils.add_overview_stats computes for new articles
+    await _execute(
+        connection,
+        'ALTER TABLE "article" ADD COLUMN "byte_count" INT NOT NULL DEFAULT 0',
+        'ALTER TABLE "article" ADD COLUMN "line_count" INT NOT NULL DEFAULT 0',
+        (
+            'UPDATE "article" SET "byte_count" = LENGTH(CAST("from" AS BLOB))'
+            ' + LENGTH(CAST("subject" AS BLOB)) + LENGTH(CAST("message_id" AS BLOB))'
+            ' + COALESCE(LENGTH(CAST("references" AS BLOB)), 0) + LENGTH(CAST("body" AS BLOB)),'
+            ' "line_count" = LENGTH("body") - LENGTH(REPLACE("body", CHAR(10), \'\')) + 1'
+        ),
+    )
+
+
+async def _add_indexes(connection: BaseDBAsyncClient) -> None:
+    # The index names are the ones generate_schemas derives for the index=True fields, so a
+    # migrated DB ends up with exactly the same indexes as a fresh one.
+    await _execute(
+        connection,
+        'CREATE INDEX IF NOT EXISTS "idx_article_created_13707c" ON "article" ("created_at")',
+        'CREATE INDEX IF NOT EXISTS "idx_newsgroup_name_00be84" ON "newsgroup" ("name")',
+        'CREATE INDEX IF NOT EXISTS "idx_newsgroup_created_a9aefc" ON "newsgroup" ("created_at")',
+        'CREATE INDEX IF NOT EXISTS "idx_dtn_spool_hash_c43457" ON "dtn_spool" ("hash")',
+        "ANALYZE",
+    )
+
+
+async def _add_compressed_body(connection: BaseDBAsyncClient) -> None:
+    # existing articles keep their uncompressed body, only new ones are stored compressed
+    await _execute(connection, 'ALTER TABLE "article" ADD COLUMN "body_z" BLOB')
+
+
+async def _add_overview_table(connection: BaseDBAsyncClient) -> None:
+    # Same table as generate_schemas creates for the Overview model. The byte_count and line_count
+    # columns of migration 2 stay in the article table of migrated DBs, unused, since dropping them
+    # would rewrite the whole table.
+    await _execute(
+        connection,
+        (
+            'CREATE TABLE IF NOT EXISTS "overview" ("newsgroup_id" INT NOT NULL, "number" INT NOT'
+            ' NULL, "subject" VARCHAR(255) NOT NULL, "from" VARCHAR(255) NOT NULL, "created_at"'
+            ' TIMESTAMP NOT NULL, "message_id" VARCHAR(255) NOT NULL, "references" TEXT,'
+            ' "byte_count" INT NOT NULL, "line_count" INT NOT NULL, "article_id" BIGINT NOT NULL'
+            ' PRIMARY KEY REFERENCES "article" ("id") ON DELETE CASCADE, CONSTRAINT'
+            ' "uid_overview_newsgro_24bd7c" UNIQUE ("newsgroup_id", "number"))'
+        ),
+        (
+            'INSERT INTO "overview" ("article_id", "newsgroup_id", "number", "subject", "from",'
+            ' "created_at", "message_id", "references", "byte_count", "line_count") SELECT "id",'
+            ' "newsgroup_id", "number", "subject", "from", "created_at", "message_id",'
+            ' "references", "byte_count", "line_count" FROM "article"'
+        ),
+    )
+
+
+# (version, description, migration) in ascending order of version
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "per-group article numbers", _add_article_numbers),
+    (2, "precomputed overview byte and line counts", _add_overview_stats),
+    (3, "secondary indexes on created_at, group name and spool hash", _add_indexes),
+    (4, "compressed article bodies", _add_compressed_body),
+    (5, "overview table apart from the article bodies", _add_overview_table),
+]
+SCHEMA_VERSION: int = MIGRATIONS[-1][0]
+
+
+async def _get_version(connection: BaseDBAsyncClient) -> int:
+    return (await connection.execute_query_dict("PRAGMA user_version"))[0]["user_version"]
+
+
+async def _set_version(connection: BaseDBAsyncClient, version: int) -> None:
+    # pragmas don't take bound parameters
+    await connection.execute_query(f"PRAGMA user_version = {int(version)}")
+
+
+async def is_fresh_db(connection: BaseDBAsyncClient) -> bool:
+    return (
+        len(
+            await connection.execute_query_dict(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'article'"
+            )
+        )
+        == 0
+    )
+
+
+async def migrate(connection: BaseDBAsyncClient, fresh: bool) -> None:
+    """
+    Brings the schema of the DB up to SCHEMA_VERSION. Every migration runs in its own transaction
+    together with the version bump, so an interrupted upgrade is simply retried on the next start.
+
+    Args:
+        connection: connection to the DB to upgrade
+        fresh: whether the DB has no tables yet, so generate_schemas will create the current
+               schema from scratch
+    """
+    if fresh:
+        await _set_version(connection, SCHEMA_VERSION)
+        return
+
+    version: int = await _get_version(connection)
+    for mig_version, description, migration in MIGRATIONS:
+        if mig_version <= version:
+            continue
+        logger.info("Migrating database schema to version %d: %s", mig_version, description)
+        async with in_transaction(connection.connection_name) as trx_connection:
+            await migration(trx_connection)
+            await _set_version(trx_connection, mig_version)
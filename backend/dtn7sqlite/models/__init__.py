@@ -1,3 +1,4 @@
 from backend.dtn7sqlite.models.article import Article  # noqa F401
 from backend.dtn7sqlite.models.dtn_message import DTNMessage  # noqa F401
 from backend.dtn7sqlite.models.newsgroup import Newsgroup  # noqa F401
+from backend.dtn7sqlite.models.overview import Overview  # noqa F401
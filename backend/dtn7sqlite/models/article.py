@@ -6,10 +6,12 @@ from backend.dtn7sqlite.models.newsgroup import Newsgroup
 
 class Article(Model):
     id = fields.BigIntField(pk=True)
+    # article number within its newsgroup (RFC 3977 Sec. 6), assigned on insert by the registry
+    number = fields.IntField(null=True)
 
     # mandatory headers
     from_ = fields.CharField(source_field="from", max_length=255, null=False)
-    created_at = fields.DatetimeField(auto_now_add=True, null=False)
+    created_at = fields.DatetimeField(auto_now_add=True, null=False, index=True)
     subject = fields.CharField(max_length=255, null=False)
     message_id = fields.CharField(max_length=255, null=False, unique=True)
     path = fields.TextField(null=True)
@@ -33,6 +35,15 @@ class Article(Model):
     # children: fields.ForeignKeyNullableRelation["Article"]
 
     body = fields.TextField(null=False)
+    # zlib compressed body, stored instead of body, which is left empty then, if
+    # backend.compress_bodies is on
+    body_z = fields.BinaryField(null=True)
+
+    # the overview data of the article, including its byte and line count, is kept in the overview
+    # table, see Overview
+
+    class Meta:
+        unique_together = (("newsgroup", "number"),)
 
     def __str__(self):
         return (
@@ -16,13 +16,15 @@ class Newsgroup(Model):
     # )
 
     id = fields.IntField(pk=True)
-    name = fields.CharField(max_length=255, null=False)
+    name = fields.CharField(max_length=255, null=False, index=True)
     is_active: fields.BooleanField(null=False, default=True)
     description = fields.TextField(null=True)
     status = fields.CharField(max_length=1, default="y")
     default_subscribe = fields.BooleanField(null=False, default=True)
-    # seq = fields.IntField(null=False, default=0)
-    created_at = fields.DatetimeField(auto_now_add=True, null=False)
+    # highest article number ever assigned in this group. Unlike the high water mark reported to
+    # clients it never goes down when articles expire, so article numbers are never reused
+    high_water = fields.IntField(null=False, default=0)
+    created_at = fields.DatetimeField(auto_now_add=True, null=False, index=True)
     updated_at = fields.DatetimeField(auto_now=True, null=False)
 
     messages: fields.ReverseRelation["Message"]  # noqa: F821
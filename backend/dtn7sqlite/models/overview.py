@@ -0,0 +1,32 @@
+from tortoise import fields
+from tortoise.models import Model
+
+
+class Overview(Model):
+    """
+    The overview data (RFC 3977 Sec. 8.3) of an article, written along with the article.
+
+    OVER, XOVER and HDR read from this table only. Its rows hold nothing but the overview fields,
+    so a range of them is read without ever touching the article rows, where SQLite would have to
+    walk the overflow pages of large bodies to get at any column stored after them.
+    """
+
+    article = fields.OneToOneField(
+        "models.Article", pk=True, related_name="overview", on_delete=fields.CASCADE
+    )
+    # not a relation of its own, rows are removed along with their article
+    newsgroup_id = fields.IntField(null=False)
+    number = fields.IntField(null=False)
+
+    subject = fields.CharField(max_length=255, null=False)
+    from_ = fields.CharField(source_field="from", max_length=255, null=False)
+    created_at = fields.DatetimeField(null=False)
+    message_id = fields.CharField(max_length=255, null=False)
+    references = fields.TextField(null=True)
+    # RFC 3977 Sec. 8.4 :bytes and :lines
+    byte_count = fields.IntField(null=False)
+    line_count = fields.IntField(null=False)
+
+    class Meta:
+        table = "overview"
+        unique_together = (("newsgroup_id", "number"),)
@@ -1,8 +1,10 @@
-from typing import TYPE_CHECKING, List, Optional, Union
-
-from tortoise.queryset import QuerySetSingle
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
+from backend.dtn7sqlite.article_cache import ArticleCache, RenderedArticle
+from backend.dtn7sqlite.lookup import ArticlePointer, get_article_values
 from backend.dtn7sqlite.models import Article, Newsgroup
+from backend.dtn7sqlite.registry import NewsgroupRegistry
+from backend.dtn7sqlite.utils import article_body
 from status_codes import StatusCodes
 from utils import build_xref
 
@@ -10,15 +12,30 @@ if TYPE_CHECKING:
     from client_connection import ClientConnection
 
 
-def get_messages_by_num(num: int, group: Newsgroup) -> QuerySetSingle[Article]:
-    return Article.get_or_none(id=num, newsgroup=group)
+# columns the header of an article is rendered from
+HEADER_FIELDS: Tuple[str, ...] = ArticlePointer.FIELDS + (
+    "from_",
+    "created_at",
+    "subject",
+    "references",
+)
+# a body is stored either as text or compressed, see Article.body_z
+BODY_FIELDS: Tuple[str, ...] = ("body", "body_z")
+
+
+async def get_messages_by_num(
+    newsgroups: NewsgroupRegistry, num: int, group: Newsgroup, fields: Tuple[str, ...]
+) -> List[dict]:
+    return await get_article_values(newsgroups, fields, number=num, newsgroup_id=group.id)
 
 
-def get_messages_by_msg_id(message_id: str) -> QuerySetSingle[Article]:
-    return Article.get_or_none(message_id=message_id)
+async def get_messages_by_msg_id(
+    newsgroups: NewsgroupRegistry, message_id: str, fields: Tuple[str, ...]
+) -> List[dict]:
+    return await get_article_values(newsgroups, fields, message_id=message_id)
 
 
-async def do_article(client_conn: "ClientConnection") -> Union[List[str], str]:
+async def do_article(client_conn: "ClientConnection") -> Union[bytes, str]:
     """
     6.2.1.1.  Usage
 
@@ -50,11 +67,51 @@ async def do_article(client_conn: "ClientConnection") -> Union[List[str], str]:
             n             Returned article number
             message-id    Article message-id
     """
-    article_info: list
-    response_status: str
+    article: Union[RenderedArticle, str] = await get_rendered_article(client_conn)
+    if isinstance(article, str):
+        return article
+
+    status: str = StatusCodes.STATUS_ARTICLE.substitute(
+        number=article.number, message_id=article.message_id
+    )
+    return b"".join(
+        [status.encode("utf-8"), b"\r\n", article.head, b"\r\n", article.body, b".\r\n"]
+    )
+
+
+def header_lines(msg: dict) -> List[str]:
+    return [
+        f"From: {msg['from_']}",
+        f"Newsgroups: {msg['group_name']}",
+        f"Date: {msg['created_at'].strftime('%a, %d %b %Y %H:%M:%S %Z')}",
+        f"Subject: {msg['subject']}",
+        f"Message-ID: {msg['message_id']}",
+        f"Xref: {build_xref(article_id=msg['number'], group_name=msg['group_name'])}",
+        f"References: {msg['references']}",
+    ]
+
 
+async def get_rendered_article(
+    client_conn: "ClientConnection", with_body: bool = True
+) -> Union[RenderedArticle, str]:
+    """
+    Looks up the article identified by the arguments of an ARTICLE, HEAD, BODY or STAT command,
+    selects it and returns it rendered, from the article cache if possible.
+
+    Args:
+        client_conn: connection the command was issued on
+        with_body: whether the body is needed as well. HEAD and STAT leave it in the DB.
+
+    Returns:
+        the rendered article or the error status to respond with
+    """
+    cache: ArticleCache = client_conn.backend.article_cache
+    newsgroups: NewsgroupRegistry = client_conn.backend.newsgroups
     identifier: Optional[str] = client_conn.cmd_args[0] if len(client_conn.cmd_args) > 0 else None
     selected_group: Optional[Newsgroup] = client_conn.selected_group
+    fields: Tuple[str, ...] = HEADER_FIELDS + BODY_FIELDS if with_body else HEADER_FIELDS
+    article: Optional[RenderedArticle]
+    rows: List[dict]
 
     # figure out how the article is supposed to be identified
     id_provided: bool = identifier is not None and "<" in identifier and ">" in identifier
@@ -62,8 +119,9 @@ async def do_article(client_conn: "ClientConnection") -> Union[List[str], str]:
 
     if id_provided:
         # RFC 3977 Sec. 6.2.1.1. First form
-        # identifier = identifier.replace("<", "").replace(">", "")
-        msg: Article = await get_messages_by_msg_id(identifier)
+        article = cache.get(identifier)
+        if article is None:
+            rows = await get_messages_by_msg_id(newsgroups, identifier, fields)
     elif nr_provided:
         # second form
         if selected_group is None:
@@ -73,35 +131,29 @@ async def do_article(client_conn: "ClientConnection") -> Union[List[str], str]:
             num: int = int(identifier)
         except ValueError:
             return StatusCodes.ERR_NOARTICLESELECTED
-        msg: Article = await get_messages_by_num(num, selected_group)
+        article = cache.get_by_number(selected_group.id, num)
+        if article is None:
+            rows = await get_messages_by_num(newsgroups, num, selected_group, fields)
     else:
         # third form
-        msg: Article = client_conn.selected_article
-
-    if msg is None:
-        return StatusCodes.ERR_NOSUCHARTICLE
-
-    client_conn.selected_article = msg
-    group_name: str = (await msg.newsgroup).name
-
-    try:
-        response_status = StatusCodes.STATUS_ARTICLE.substitute(
-            number=msg.id, message_id=msg.message_id
-        )
-    except AttributeError:
-        return StatusCodes.ERR_NOSUCHARTICLENUM
-
-    result = [
-        response_status,
-        f"From: {msg.from_}",
-        f"Newsgroups: {group_name}",
-        f"Date: {msg.created_at.strftime('%a, %d %b %Y %H:%M:%S %Z')}",
-        f"Subject: {msg.subject}",
-        f"Message-ID: {msg.message_id}",
-        f"Xref: {build_xref(article_id=msg.id, group_name=group_name)}",
-        f"References: {msg.references}",
-        "",
-        f"{msg.body}",
-    ]
-
-    return result
+        if client_conn.selected_article is None:
+            return StatusCodes.ERR_NOSUCHARTICLE
+        article = cache.get(client_conn.selected_article.message_id)
+        if article is None:
+            rows = await get_article_values(newsgroups, fields, id=client_conn.selected_article.id)
+
+    if article is None:
+        if len(rows) == 0:
+            return StatusCodes.ERR_NOSUCHARTICLE
+        article = RenderedArticle.render(rows[0], header_lines(rows[0]))
+        cache.put(article)
+    elif with_body and article.body is None:
+        # cached by HEAD or STAT before, the body is only loaded now
+        row: Optional[dict] = await Article.filter(id=article.id).first().values(*BODY_FIELDS)
+        if row is None:
+            return StatusCodes.ERR_NOSUCHARTICLE
+        article = article.with_body(article_body(row))
+        cache.put(article)
+
+    client_conn.selected_article = article.pointer()
+    return article
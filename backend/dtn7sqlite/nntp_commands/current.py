@@ -1,17 +1,27 @@
 from typing import TYPE_CHECKING, List, Union
 
-from tortoise.queryset import QuerySet
+from tortoise.expressions import Subquery
+from tortoise.queryset import ValuesQuery
 
-from backend.dtn7sqlite.models import Article
+from backend.dtn7sqlite.lookup import group_name
+from backend.dtn7sqlite.models import Article, Overview
+from backend.dtn7sqlite.nntp_commands.over import OVERVIEW_FIELDS
 from status_codes import StatusCodes
-from utils import get_bytes_len, get_num_lines
 
 if TYPE_CHECKING:
     from client_connection import ClientConnection
 
 
-def get_current_messages(limit: int) -> QuerySet[Article]:
-    return Article.all().order_by("-created_at").limit(limit)
+def get_current_messages(limit: int) -> ValuesQuery:
+    # the newest articles are found on the created_at index of the article table, their overview
+    # is read from the overview table
+    return (
+        Overview.filter(
+            article_id__in=Subquery(Article.all().order_by("-created_at").limit(limit).values("id"))
+        )
+        .order_by("-created_at")
+        .values(*OVERVIEW_FIELDS, "newsgroup_id")
+    )
 
 
 async def do_current(client_conn: "ClientConnection") -> Union[List[str], str]:
@@ -20,7 +30,7 @@ async def do_current(client_conn: "ClientConnection") -> Union[List[str], str]:
     """
 
     options: List[str] = client_conn.cmd_args
-    article_list: List[Article] = []
+    article_list: List[dict] = []
     lim: int = 10
 
     if options is not None and len(options) > 0 or options is None:
@@ -33,20 +43,19 @@ async def do_current(client_conn: "ClientConnection") -> Union[List[str], str]:
 
     headers: List[str] = []
     for msg in article_list:
-        references: str = msg.references if msg.references is not None else ""
-        group_name: str = (await msg.newsgroup).name
+        references: str = msg["references"] if msg["references"] is not None else ""
         headers.append(
             "\t".join(
                 [
-                    str(msg.id),
-                    msg.subject,
-                    msg.from_,
-                    msg.created_at.strftime("%a, %d %b %Y %H:%M:%S %Z"),
-                    msg.message_id,
-                    group_name,
+                    str(msg["number"]),
+                    msg["subject"],
+                    msg["from_"],
+                    msg["created_at"].strftime("%a, %d %b %Y %H:%M:%S %Z"),
+                    msg["message_id"],
+                    await group_name(client_conn.backend.newsgroups, msg["newsgroup_id"]),
                     references,
-                    str(get_bytes_len(msg)),
-                    str(get_num_lines(msg)),
+                    str(msg["byte_count"]),
+                    str(msg["line_count"]),
                 ]
             )
         )
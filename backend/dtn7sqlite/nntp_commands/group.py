@@ -1,8 +1,8 @@
 from typing import TYPE_CHECKING, List, Optional
 
-from tortoise.functions import Count, Max, Min
-
+from backend.dtn7sqlite.lookup import get_pointer
 from backend.dtn7sqlite.models import Article, Newsgroup
+from backend.dtn7sqlite.registry import GroupWatermarks
 from status_codes import StatusCodes
 
 if TYPE_CHECKING:
@@ -27,34 +27,22 @@ async def do_group(client_conn: "ClientConnection") -> str:
     if len(tokens) != 1:
         return StatusCodes.ERR_CMDSYNTAXERROR
 
-    new_group: Optional[Newsgroup] = await Newsgroup.get_or_none(name=tokens[0])
+    new_group: Optional[Newsgroup] = client_conn.backend.newsgroups.get(tokens[0])
     if new_group is None:
         return StatusCodes.ERR_NOSUCHGROUP
     client_conn.selected_group = new_group
-    # if the selected group is empty, filter.first() will return None so this is RFC-compliant:
+    group_stats: GroupWatermarks = client_conn.backend.newsgroups.watermarks(new_group)
+    # if the selected group is empty, no article is selected so this is RFC-compliant:
     client_conn.selected_article = (
-        await Article.filter(newsgroup=client_conn.selected_group).order_by("id").first()
-    )
-    group_stats: Optional[dict] = (
-        await Article.annotate(count=Count("id"), max=Max("id"), min=Min("id"))
-        .group_by("newsgroup__id")
-        .filter(newsgroup=client_conn.selected_group)
-        .first()
-        .values(name="newsgroup__name", count="count", min="min", max="max")
+        await get_pointer(Article.filter(number=group_stats.low, newsgroup=new_group))
+        if group_stats.count > 0
+        else None
     )
 
-    if group_stats is None:
-        # RFC 3977 Sec. 6.1.1.2.
-        return StatusCodes.STATUS_GROUPSELECTED.substitute(
-            count=0,
-            first=0,
-            last=0,
-            name=client_conn.selected_group.name,
-        )
-
+    # RFC 3977 Sec. 6.1.1.2.: an empty group reports all zeroes
     return StatusCodes.STATUS_GROUPSELECTED.substitute(
-        count=group_stats["count"],
-        first=group_stats["min"],
-        last=group_stats["max"],
-        name=group_stats["name"],
+        count=group_stats.count,
+        first=group_stats.low,
+        last=group_stats.high,
+        name=new_group.name,
     )
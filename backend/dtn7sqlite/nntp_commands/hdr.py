@@ -1,53 +1,53 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Tuple, Union
 
-from backend.dtn7sqlite.models import Article
+from backend.dtn7sqlite.lookup import get_article_values
+from backend.dtn7sqlite.models import Overview
+from backend.dtn7sqlite.streaming import iter_article_range, stream_rows
 from status_codes import StatusCodes
-from utils import (
-    ParsedRange,
-    RangeParseStatus,
-    build_xref,
-    get_bytes_len,
-    get_num_lines,
-)
+from utils import ParsedRange, RangeParseStatus, build_xref
 
 if TYPE_CHECKING:
     from client_connection import ClientConnection
 
 
-async def augment_article(art: Article) -> Article:
-    await art.fetch_related("newsgroup")
-    return art
+# overview fields any header can be built from
+HDR_FIELDS: Tuple[str, ...] = (
+    "number",
+    "subject",
+    "from_",
+    "created_at",
+    "message_id",
+    "references",
+    "byte_count",
+    "line_count",
+)
 
 
-def get_header(art: Article, field_name: str) -> str:
+def get_header(art: dict, field_name: str, group_name: str) -> str:
     fn = field_name.lower()
     if fn == "subject":
-        return art.subject
+        return art["subject"]
     elif fn == "from":
-        return art.from_
+        return art["from_"]
     elif fn == "date":
-        return art.created_at
+        return art["created_at"].strftime("%a, %d %b %Y %H:%M:%S %Z")
     elif fn == "message-id":
-        return art.message_id
+        return art["message_id"]
     elif fn == "references":
-        return art.references
+        return art["references"] or ""
     elif fn == "newsgroups":
-        return art.newsgroup.name
+        return group_name
     elif fn == ":bytes":
-        return str(get_bytes_len(art))
+        return str(art["byte_count"])
     elif fn == ":lines":
-        return str(get_num_lines(art))
+        return str(art["line_count"])
     elif fn == "xref":
-        try:
-            return build_xref(art.id, art.newsgroup.name)
-        except Exception as e:
-            print(e)
-            return ""
+        return build_xref(art["number"], group_name)
     else:
         return ""
 
 
-async def do_hdr(client_conn: "ClientConnection") -> Union[List[str], str]:
+async def do_hdr(client_conn: "ClientConnection") -> Union[List[str], str, AsyncIterator[str]]:
     """
     8.5.1.  Usage
 
@@ -88,41 +88,48 @@ async def do_hdr(client_conn: "ClientConnection") -> Union[List[str], str]:
         return StatusCodes.ERR_CMDSYNTAXERROR
 
     identifier: Optional[str] = tokens[1] if len(tokens) > 1 else None
-    articles: List[Article] = []
-    status_str: str
-    msg_id_provided: bool = False
+    articles: List[dict] = []
 
     if identifier is not None:
-        if "-" in identifier:
-            if client_conn.selected_group is None:
-                return StatusCodes.ERR_NOGROUPSELECTED
-
-            parsed_range: ParsedRange = ParsedRange(range_str=identifier, max_value=2**63)
-            if parsed_range.parse_status == RangeParseStatus.FAILURE:
-                return StatusCodes.ERR_NOTPERFORMED
-            articles = await Article.filter(
-                newsgroup__name=client_conn.selected_group.name,
-                id__gte=parsed_range.start,
-                id__lte=parsed_range.stop,
-            ).prefetch_related("newsgroup")
-            if len(articles) == 0:
-                return StatusCodes.ERR_NOARTICLESINRANGE
-
-        elif "<" in identifier and ">" in identifier:
-            msg_id_provided = True
-            articles = [
-                await Article.get_or_none(message_id=identifier).prefetch_related("newsgroup")
-            ]
+        if "<" in identifier and ">" in identifier:
+            articles = await get_article_values(
+                client_conn.backend.newsgroups,
+                HDR_FIELDS,
+                model=Overview,
+                article__message_id=identifier,
+            )
             if len(articles) == 0:
                 return StatusCodes.ERR_NOSUCHARTICLE
-    else:
+            # article number is 0 when the article is identified by its message-id
+            return [StatusCodes.STATUS_HEADERS_FOLLOW] + [
+                f"0 {get_header(art, field_name, art['group_name'])}" for art in articles
+            ]
+
         if client_conn.selected_group is None:
             return StatusCodes.ERR_NOGROUPSELECTED
-        if client_conn.selected_article is None:
-            return StatusCodes.ERR_NOARTICLESELECTED
-        await client_conn.selected_article.fetch_related("newsgroup")
-        articles = [client_conn.selected_article]
 
+        parsed_range: ParsedRange = ParsedRange(range_str=identifier, max_value=2**63)
+        if parsed_range.parse_status == RangeParseStatus.FAILURE:
+            return StatusCodes.ERR_NOTPERFORMED
+        group_name: str = client_conn.selected_group.name
+        # large ranges are streamed to the client chunk by chunk
+        lines: Optional[AsyncIterator[str]] = await stream_rows(
+            StatusCodes.STATUS_HEADERS_FOLLOW,
+            iter_article_range(
+                client_conn.selected_group, parsed_range.start, parsed_range.stop, *HDR_FIELDS
+            ),
+            lambda art: f"{art['number']} {get_header(art, field_name, group_name)}",
+        )
+        if lines is None:
+            return StatusCodes.ERR_NOARTICLESINRANGE
+        return lines
+
+    if client_conn.selected_group is None:
+        return StatusCodes.ERR_NOGROUPSELECTED
+    if client_conn.selected_article is None:
+        return StatusCodes.ERR_NOARTICLESELECTED
+    articles = await Overview.filter(article_id=client_conn.selected_article.id).values(*HDR_FIELDS)
     return [StatusCodes.STATUS_HEADERS_FOLLOW] + [
-        f"{0 if msg_id_provided else art.id} {get_header(art, field_name)}" for art in articles
+        f"{art['number']} {get_header(art, field_name, client_conn.selected_group.name)}"
+        for art in articles
     ]
@@ -1,13 +1,14 @@
-from typing import TYPE_CHECKING, List, Union
+from typing import TYPE_CHECKING, Union
 
-from backend.dtn7sqlite.nntp_commands.article import do_article
+from backend.dtn7sqlite.article_cache import RenderedArticle
+from backend.dtn7sqlite.nntp_commands.article import get_rendered_article
 from status_codes import StatusCodes
 
 if TYPE_CHECKING:
     from client_connection import ClientConnection
 
 
-async def do_head_body_stat(client_conn: "ClientConnection") -> Union[List[str], str]:
+async def do_head_body_stat(client_conn: "ClientConnection") -> Union[bytes, str]:
     """
     6.2.2/3.2.  Description
 
@@ -26,25 +27,26 @@ async def do_head_body_stat(client_conn: "ClientConnection") -> Union[List[str],
         NOT multi-line.
     """
 
-    res = await do_article(client_conn)
-
+    # HEAD and STAT leave the body in the DB
+    article: Union[RenderedArticle, str] = await get_rendered_article(
+        client_conn, with_body=client_conn.command not in ("head", "stat")
+    )
     # pipe through any errors:
-    if isinstance(res, str):
-        return res
-    status, num, msg_id, _ = res[0].split(" ", 3)
-    if status[0] != "2":
-        return res
-
-    last_header_line: int = 0
-    while res[last_header_line] != "":
-        last_header_line += 1
+    if isinstance(article, str):
+        return article
+
+    if client_conn.command == "stat":
+        return StatusCodes.STATUS_STAT.substitute(
+            number=article.number, message_id=article.message_id
+        )
     if client_conn.command == "head":
-        res[0] = StatusCodes.STATUS_HEAD.substitute(number=num, message_id=msg_id)
-        res = res[:last_header_line]
-    elif client_conn.command == "stat":
-        res = StatusCodes.STATUS_STAT.substitute(number=num, message_id=msg_id)
+        status: str = StatusCodes.STATUS_HEAD.substitute(
+            number=article.number, message_id=article.message_id
+        )
+        block: bytes = article.head
     else:
-        last_header_line += 1
-        res = res[last_header_line:]
-        res = [StatusCodes.STATUS_BODY.substitute(number=num, message_id=msg_id)] + res
-    return res
+        status: str = StatusCodes.STATUS_BODY.substitute(
+            number=article.number, message_id=article.message_id
+        )
+        block: bytes = article.body
+    return b"".join([status.encode("utf-8"), b"\r\n", block, b".\r\n"])
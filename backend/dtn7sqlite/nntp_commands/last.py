@@ -1,5 +1,6 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
+from backend.dtn7sqlite.lookup import ArticlePointer, get_pointer
 from backend.dtn7sqlite.models import Article, Newsgroup
 from status_codes import StatusCodes
 
@@ -28,16 +29,16 @@ async def do_last(client_conn: "ClientConnection") -> str:
     """
 
     selected_group: Newsgroup = client_conn.selected_group
-    selected_article: Article = client_conn.selected_article
+    selected_article: Optional[ArticlePointer] = client_conn.selected_article
     if selected_group is None:
         return StatusCodes.ERR_NOGROUPSELECTED
     if selected_article is None:
         return StatusCodes.ERR_NOARTICLESELECTED
 
-    msg: Article = (
-        await Article.filter(newsgroup__name=selected_group.name, id__lt=selected_article.id)
-        .order_by("-id")
-        .first()
+    msg: Optional[ArticlePointer] = await get_pointer(
+        Article.filter(newsgroup=selected_group, number__lt=selected_article.number).order_by(
+            "-number"
+        )
     )
 
     if msg is None:
@@ -45,4 +46,4 @@ async def do_last(client_conn: "ClientConnection") -> str:
 
     client_conn.selected_article = msg
 
-    return StatusCodes.STATUS_NEXTLAST.substitute(number=msg.id, message_id=msg.message_id)
+    return StatusCodes.STATUS_NEXTLAST.substitute(number=msg.number, message_id=msg.message_id)
@@ -1,11 +1,9 @@
 from typing import TYPE_CHECKING, List, Optional, Union
 
-from tortoise.functions import Max, Min
-
 from backend.dtn7sqlite.models import Newsgroup
+from backend.dtn7sqlite.registry import GroupWatermarks, NewsgroupRegistry
 from logger import global_logger
 from status_codes import StatusCodes
-from utils import groupname_filter
 
 if TYPE_CHECKING:
     from client_connection import ClientConnection
@@ -51,6 +49,26 @@ extensions = (
 )
 
 
+def active_groups(newsgroups: NewsgroupRegistry, wildmat: Optional[str] = None) -> List[dict]:
+    """
+    Active list entries of all groups in the registry, or of the groups matching the wildmat,
+    sorted by name. Served from memory.
+    """
+    result: List[dict] = []
+    for g in newsgroups.sorted_groups() if wildmat is None else newsgroups.match(wildmat):
+        group_stats: GroupWatermarks = newsgroups.watermarks(g)
+        result.append(
+            {
+                "name": g.name,
+                "high": group_stats.high,
+                "low": group_stats.low,
+                "status": g.status,
+                "created_at": g.created_at,
+            }
+        )
+    return result
+
+
 async def do_list(client_conn: "ClientConnection") -> Union[List[str], str]:
     """
     7.6.1.1.  Usage
@@ -96,25 +114,13 @@ async def do_list(client_conn: "ClientConnection") -> Union[List[str], str]:
         return StatusCodes.ERR_CMDSYNTAXERROR
 
     if option is None or option == "active" or len(option) == 0:
-        group_stats = (
-            await Newsgroup.annotate(high=Max("messages__id"), low=Min("messages__id"))
-            .order_by("name")
-            .values("high", "low", "name", "status")
+        group_stats: List[dict] = active_groups(
+            client_conn.backend.newsgroups, wildmat=tokens[1] if len(tokens) == 2 else None
         )
-        if len(tokens) == 2:
-            # a wildmat was passed and there is no sane way to query a modern
-            # DB against this sort of pattern since it was created more or less
-            # only for NNTP *sheesh*
-            pattern: str = tokens[1]
-            group_stats = groupname_filter(group_stats, pattern)
 
         result_stats = [StatusCodes.STATUS_LIST]
         result_stats.extend(
-            [
-                f"{g['name']} {g['high'] if g['high'] is not None else '0'} "
-                f"{g['low'] if g['low'] is not None else '0'} {g['status']}"
-                for g in group_stats
-            ]
+            [f"{g['name']} {g['high']} {g['low']} {g['status']}" for g in group_stats]
         )
     else:
         if option == "overview.fmt":
@@ -131,16 +137,12 @@ async def do_list(client_conn: "ClientConnection") -> Union[List[str], str]:
             pass
         elif option == "newsgroups":
             result_stats = [StatusCodes.STATUS_LISTNEWSGROUPS]
-            groups: Union[filter, List[dict]] = (
-                await Newsgroup.all().order_by("name").values("name", "description")
+            groups: List[Newsgroup] = (
+                client_conn.backend.newsgroups.match(tokens[1])
+                if len(tokens) == 2
+                else client_conn.backend.newsgroups.sorted_groups()
             )
-            if len(tokens) == 2:
-                # a wildmat was passed and there is no sane way to query a modern
-                # DB against this sort of pattern since it was created more or less
-                # only for NNTP *sheesh*
-                pattern: str = tokens[1]
-                groups = groupname_filter(groups, pattern)
-            result_stats.extend([f"{g['name']} {g['description']}" for g in groups])
+            result_stats.extend([f"{g.name} {g.description}" for g in groups])
         else:
             # if option in ["distributions", "active.times", "distrib.pats"]
             return StatusCodes.ERR_NOTPERFORMED
@@ -1,9 +1,8 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Union
 
-from tortoise.functions import Count, Max, Min
-from tortoise.queryset import ValuesQuery
-
-from backend.dtn7sqlite.models import Article, Newsgroup
+from backend.dtn7sqlite.models import Newsgroup
+from backend.dtn7sqlite.registry import GroupWatermarks
+from backend.dtn7sqlite.streaming import iter_article_range
 from status_codes import StatusCodes
 from utils import ParsedRange, RangeParseStatus
 
@@ -11,15 +10,7 @@ if TYPE_CHECKING:
     from client_connection import ClientConnection
 
 
-def get_group_stats(group_name: str) -> ValuesQuery:
-    return (
-        Article.annotate(count=Count("id"), max=Max("id"), min=Min("id"))
-        .filter(newsgroup__name=group_name)
-        .values(name="newsgroup__name", count="count", min="min", max="max")
-    )
-
-
-async def do_listgroup(client_conn: "ClientConnection") -> Union[List[str], str]:
+async def do_listgroup(client_conn: "ClientConnection") -> Union[str, AsyncIterator[str]]:
     """
     6.1.2.1.  Usage
 
@@ -47,13 +38,12 @@ async def do_listgroup(client_conn: "ClientConnection") -> Union[List[str], str]
     tokens: List[str] = client_conn.cmd_args
     group_name: Optional[str] = tokens[0] if len(tokens) > 0 else None
     num_range: Optional[str] = tokens[1] if len(tokens) > 1 else None
-    result: List[str]
-    msgs: List[Article]
-    status_str: str
+    start: int = 0
+    stop: int = 2**63
 
     if group_name is not None:
         # group name provided, so select the group
-        new_group: Newsgroup = await Newsgroup.get_or_none(name=group_name)
+        new_group: Optional[Newsgroup] = client_conn.backend.newsgroups.get(group_name)
         if new_group is None:
             return StatusCodes.ERR_NOSUCHGROUP
         client_conn.selected_group = new_group
@@ -61,29 +51,29 @@ async def do_listgroup(client_conn: "ClientConnection") -> Union[List[str], str]
     if client_conn.selected_group is None:
         return StatusCodes.ERR_NOGROUPSELECTED
 
-    if num_range is None:
-        # msgs = await Message.filter(newsgroup__name=client_conn.selected_group.name)
-        msgs = await Article.filter(newsgroup=client_conn.selected_group)
-    else:
+    if num_range is not None:
         parsed_range: ParsedRange = ParsedRange(range_str=num_range, max_value=2**63)
         if parsed_range.parse_status == RangeParseStatus.FAILURE:
             return StatusCodes.ERR_NOTPERFORMED
-        msgs = await Article.filter(
-            newsgroup__name=client_conn.selected_group.name,
-            id__gte=parsed_range.start,
-            id__lte=parsed_range.stop,
-        )
-
-    ids: List[int] = [msg.id for msg in msgs]
-    if len(ids) > 0:
-        status_str = StatusCodes.STATUS_LISTGROUP.substitute(
-            number=len(msgs), low=min(ids), high=max(ids), group=client_conn.selected_group.name
-        )
-        result = [status_str] + list(map(str, ids))
-    else:
-        status_str = StatusCodes.STATUS_LISTGROUP.substitute(
-            number=len(msgs), low=0, high=0, group=client_conn.selected_group.name
-        )
-        result = [status_str]
-
-    return result
+        start, stop = parsed_range.start, parsed_range.stop
+
+    # the status line reports the group, not the requested range (RFC 3977 Sec. 6.1.2.2.)
+    group_stats: GroupWatermarks = client_conn.backend.newsgroups.watermarks(
+        client_conn.selected_group
+    )
+    status_str: str = StatusCodes.STATUS_LISTGROUP.substitute(
+        number=group_stats.count,
+        low=group_stats.low,
+        high=group_stats.high,
+        group=client_conn.selected_group.name,
+    )
+    return _stream_numbers(
+        status_str, iter_article_range(client_conn.selected_group, start, stop, "number")
+    )
+
+
+async def _stream_numbers(status_str: str, chunks: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    yield status_str
+    async for chunk in chunks:
+        for row in chunk:
+            yield str(row["number"])
@@ -19,7 +19,7 @@ async def do_mode(client_conn: "ClientConnection") -> str:
         500 Command not understood
     """
     tokens: List[str] = client_conn.cmd_args
-    logger.debug(f"in do_mode with {tokens}")
+    logger.debug("in do_mode with %s", tokens)
     if tokens[0] == "reader":
         if server_config["server_type"] == "read-only":
             return StatusCodes.STATUS_NOPOSTMODE
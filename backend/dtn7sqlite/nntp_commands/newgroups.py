@@ -1,8 +1,6 @@
 from typing import TYPE_CHECKING, List, Union
 
-from tortoise.functions import Max, Min
-
-from backend.dtn7sqlite.models import Newsgroup
+from backend.dtn7sqlite.nntp_commands.list_command import active_groups
 from status_codes import StatusCodes
 from utils import get_datetime
 
@@ -36,20 +34,11 @@ async def do_newgroups(client_conn: "ClientConnection") -> Union[List[str], str]
         return StatusCodes.ERR_CMDSYNTAXERROR
     # tz_: Optional[str] = tokens[2] if len(tokens) == 3 else None
 
-    group_stats = (
-        await Newsgroup.filter(created_at__gte=gte_date)
-        .annotate(high=Max("messages__id"), low=Min("messages__id"))
-        .order_by("name")
-        .values("high", "low", "name", "status")
-    )
+    group_stats: List[dict] = [
+        g for g in active_groups(client_conn.backend.newsgroups) if g["created_at"] >= gte_date
+    ]
 
     result_stats = [StatusCodes.STATUS_NEWGROUPS]
-    result_stats.extend(
-        [
-            f"{g['name']} {g['high'] if g['high'] is not None else '0'} "
-            f"{g['low'] if g['low'] is not None else '0'} {g['status']}"
-            for g in group_stats
-        ]
-    )
+    result_stats.extend([f"{g['name']} {g['high']} {g['low']} {g['status']}" for g in group_stats])
 
     return result_stats
@@ -1,8 +1,8 @@
 from typing import TYPE_CHECKING, List, Union
 
-from backend.dtn7sqlite.models import Article, Newsgroup
+from backend.dtn7sqlite.models import Article
 from status_codes import StatusCodes
-from utils import get_datetime, groupname_filter
+from utils import get_datetime
 
 if TYPE_CHECKING:
     from client_connection import ClientConnection
@@ -35,12 +35,12 @@ async def do_newnews(client_conn: "ClientConnection") -> Union[List[str], str]:
     except (IndexError, ValueError):
         return StatusCodes.ERR_CMDSYNTAXERROR
 
-    matching_groups = groupname_filter(
-        groups=(await Newsgroup.all().values("id", "name")), pattern=wildmat
-    )
-    group_ids: List[int] = [g["id"] for g in matching_groups]
+    # groups are matched in memory, the DB only sees the ids of the matching groups
+    group_ids: List[int] = [g.id for g in client_conn.backend.newsgroups.match(wildmat)]
+    if len(group_ids) == 0:
+        return [StatusCodes.STATUS_NEWNEWS]
     articles: List[dict] = await Article.filter(
-        created_at__gte=gte_date, newsgroup__id__in=group_ids
+        created_at__gte=gte_date, newsgroup_id__in=group_ids
     ).values("message_id")
 
     result_stats = [StatusCodes.STATUS_NEWNEWS] + [art["message_id"] for art in articles]
@@ -1,28 +1,58 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Tuple, Union
 
-from tortoise.queryset import QuerySet
+from tortoise.queryset import QuerySet, ValuesQuery
 
-from backend.dtn7sqlite.models import Article, Newsgroup
+from backend.dtn7sqlite.lookup import get_article_values
+from backend.dtn7sqlite.models import Newsgroup, Overview
+from backend.dtn7sqlite.streaming import iter_article_range, stream_rows
 from status_codes import StatusCodes
-from utils import (
-    ParsedRange,
-    RangeParseStatus,
-    build_xref,
-    get_bytes_len,
-    get_num_lines,
-)
+from utils import ParsedRange, RangeParseStatus, build_xref
 
 if TYPE_CHECKING:
     from client_connection import ClientConnection
 
 
-def get_messages(group: Newsgroup, start: int, stop: int) -> QuerySet[Article]:
-    return Article.filter(newsgroup__name=group.name, id__gte=start, id__lte=stop).order_by(
-        "created_at"
+# everything an overview line is made of, all of it in the overview table
+OVERVIEW_FIELDS: Tuple[str, ...] = (
+    "number",
+    "subject",
+    "from_",
+    "created_at",
+    "message_id",
+    "references",
+    "byte_count",
+    "line_count",
+)
+
+
+def overview(query: QuerySet[Overview]) -> ValuesQuery:
+    return query.values(*OVERVIEW_FIELDS)
+
+
+def get_messages(group: Newsgroup, start: int, stop: int) -> AsyncIterator[List[dict]]:
+    return iter_article_range(group, start, stop, *OVERVIEW_FIELDS)
+
+
+def overview_line(msg: dict, group_name: str) -> str:
+    references: str = msg["references"] if msg["references"] is not None else ""
+    return "\t".join(
+        [
+            str(msg["number"]),
+            msg["subject"],
+            msg["from_"],
+            msg["created_at"].strftime("%a, %d %b %Y %H:%M:%S %Z"),
+            msg["message_id"],
+            references,
+            str(msg["byte_count"]),
+            str(msg["line_count"]),
+            f"Xref: {build_xref(article_id=msg['number'], group_name=group_name)}",
+        ]
     )
 
 
-async def do_over(client_conn: "ClientConnection") -> Union[List[str], str]:
+async def do_over(
+    client_conn: "ClientConnection",
+) -> Union[List[str], str, AsyncIterator[str]]:
     """
     8.3.1.  Usage
 
@@ -56,21 +86,30 @@ async def do_over(client_conn: "ClientConnection") -> Union[List[str], str]:
     selected_group: Optional[Newsgroup] = client_conn.selected_group
     selected_article = client_conn.selected_article
     options: List[str] = client_conn.cmd_args
-    article_list: List[Article] = []
+    article_list: List[dict] = []
 
     if len(options) == 0 or options is None:
         if selected_group is None:
             return StatusCodes.ERR_NOGROUPSELECTED
         if selected_article is None:
             return StatusCodes.ERR_NOARTICLESELECTED
-        article_list = [selected_article]
+        article_list = await overview(Overview.filter(article_id=selected_article.id))
     elif len(options) == 1:
         arg: str = options[0]
 
         if "<" in arg and ">" in arg:
-            article_list = [await Article.get_or_none(message_id=arg)]
+            article_list = await get_article_values(
+                client_conn.backend.newsgroups,
+                OVERVIEW_FIELDS,
+                model=Overview,
+                article__message_id=arg,
+            )
             if len(article_list) == 0:
                 return StatusCodes.ERR_NOSUCHARTICLE
+            # the article doesn't have to be in the selected group, if any
+            return [StatusCodes.STATUS_XOVER] + [
+                overview_line(msg, msg["group_name"]) for msg in article_list
+            ]
         else:
             if client_conn.selected_group is None:
                 return StatusCodes.ERR_NOGROUPSELECTED
@@ -79,31 +118,16 @@ async def do_over(client_conn: "ClientConnection") -> Union[List[str], str]:
             if parsed_range.parse_status == RangeParseStatus.FAILURE:
                 return StatusCodes.ERR_NOTPERFORMED
 
-            try:
-                article_list = await get_messages(
-                    selected_group, parsed_range.start, parsed_range.stop
-                )
-            except Exception as e:
-                print(e)
-            if len(article_list) == 0:
+            # large ranges are streamed to the client chunk by chunk
+            lines: Optional[AsyncIterator[str]] = await stream_rows(
+                StatusCodes.STATUS_XOVER,
+                get_messages(selected_group, parsed_range.start, parsed_range.stop),
+                lambda msg: overview_line(msg, selected_group.name),
+            )
+            if lines is None:
                 return StatusCodes.ERR_NOSUCHARTICLENUM
+            return lines
 
-    headers: List[str] = []
-    for msg in article_list:
-        references: str = msg.references if msg.references is not None else ""
-        headers.append(
-            "\t".join(
-                [
-                    str(msg.id),
-                    msg.subject,
-                    msg.from_,
-                    msg.created_at.strftime("%a, %d %b %Y %H:%M:%S %Z"),
-                    msg.message_id,
-                    references,
-                    str(get_bytes_len(msg)),
-                    str(get_num_lines(msg)),
-                    f"Xref: {build_xref(article_id=msg.id, group_name=selected_group.name)}",
-                ]
-            )
-        )
-    return [StatusCodes.STATUS_XOVER] + headers
+    return [StatusCodes.STATUS_XOVER] + [
+        overview_line(msg, selected_group.name) for msg in article_list
+    ]
@@ -0,0 +1,191 @@
+import re
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tortoise.functions import Count, Max, Min
+
+from backend.dtn7sqlite.models import Article, Newsgroup
+from utils import compile_wildmat, wildmat_prefix
+
+
+class GroupWatermarks:
+    """
+    Article count and low/high water marks of a newsgroup. All values are 0 for an empty group,
+    as mandated by RFC 3977 Sec. 6.1.1.2.
+    """
+
+    __slots__ = ("count", "low", "high")
+
+    def __init__(self, count: int = 0, low: int = 0, high: int = 0):
+        self.count: int = count
+        self.low: int = low
+        self.high: int = high
+
+    def __repr__(self):
+        return f"GroupWatermarks <count={self.count} low={self.low} high={self.high}>"
+
+
+class NewsgroupRegistry(Mapping):
+    """
+    In-memory registry of all newsgroups carried by this server along with their article
+    watermarks. Maps group names to Newsgroup instances.
+
+    GROUP, LIST ACTIVE and friends are answered from here without touching the DB. The watermarks
+    are loaded once on startup and updated incrementally as articles are written and expire. The
+    registry also hands out article numbers.
+    """
+
+    def __init__(self):
+        self._groups: Dict[str, Newsgroup] = {}
+        self._groups_by_id: Dict[int, Newsgroup] = {}
+        self._sorted_names: List[str] = []
+        self._watermarks: Dict[int, GroupWatermarks] = {}
+
+    def __getitem__(self, name: str) -> Newsgroup:
+        return self._groups[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._groups)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._groups.keys())
+
+    def sorted_groups(self) -> List[Newsgroup]:
+        return [self._groups[name] for name in self._sorted_names]
+
+    def match(self, wildmat: str) -> List[Newsgroup]:
+        """
+        All groups whose names match the wildmat, sorted by name. A plain "prefix*" pattern is
+        answered by a binary search over the sorted names, other wildmats are matched against every
+        name with the compiled and cached regex of the pattern.
+        """
+        prefix: Optional[str] = wildmat_prefix(wildmat)
+        if prefix is not None:
+            matches: List[Newsgroup] = []
+            i: int = bisect_left(self._sorted_names, prefix)
+            while i < len(self._sorted_names) and self._sorted_names[i].startswith(prefix):
+                matches.append(self._groups[self._sorted_names[i]])
+                i += 1
+            return matches
+        regex: "re.Pattern[str]" = compile_wildmat(wildmat)
+        return [self._groups[name] for name in self._sorted_names if regex.fullmatch(name)]
+
+    def by_id(self, group_id: int) -> Optional[Newsgroup]:
+        return self._groups_by_id.get(group_id)
+
+    def watermarks(self, group: Newsgroup) -> GroupWatermarks:
+        return self._watermarks.setdefault(group.id, GroupWatermarks())
+
+    async def load(self) -> None:
+        self._groups = {ng.name: ng for ng in await Newsgroup.all()}
+        self._groups_by_id = {ng.id: ng for ng in self._groups.values()}
+        self._sorted_names = sorted(self._groups)
+        self._watermarks = {}
+        await self.refresh()
+
+    def add(self, group: Newsgroup) -> None:
+        if group.name not in self._groups:
+            insort(self._sorted_names, group.name)
+        self._groups[group.name] = group
+        self._groups_by_id[group.id] = group
+        self._watermarks[group.id] = GroupWatermarks()
+
+    def remove(self, name: str) -> None:
+        group: Optional[Newsgroup] = self._groups.pop(name, None)
+        if group is not None:
+            self._sorted_names.remove(name)
+            self._groups_by_id.pop(group.id, None)
+            self._watermarks.pop(group.id, None)
+
+    def assign_numbers(self, articles: List[dict]) -> Dict[int, int]:
+        """
+        Assigns the next article numbers of their groups to the passed articles. Must be called
+        within the transaction that inserts the articles, so numbers become visible in the order
+        they were handed out.
+
+        Returns:
+            the new high water mark of every affected group by group id, to be persisted in the
+            same transaction
+        """
+        high_water: Dict[int, int] = {}
+        for article_data in articles:
+            group: Newsgroup = article_data["newsgroup"]
+            group.high_water += 1
+            article_data["number"] = group.high_water
+            high_water[group.id] = group.high_water
+        return high_water
+
+    def release_numbers(self, articles: List[dict]) -> None:
+        """
+        Takes back the numbers assigned to the passed articles if their transaction failed, so the
+        next batch gets them again and no gap is left.
+        """
+        for article_data in articles:
+            if article_data.get("number") is None:
+                continue
+            group: Newsgroup = article_data["newsgroup"]
+            group.high_water = min(group.high_water, article_data["number"] - 1)
+            article_data["number"] = None
+
+    def articles_added(self, articles: List[dict]) -> None:
+        """
+        Updates the watermarks after the passed articles have been committed.
+        """
+        for article_data in articles:
+            group_stats: GroupWatermarks = self.watermarks(article_data["newsgroup"])
+            if group_stats.count == 0:
+                group_stats.low = article_data["number"]
+            group_stats.count += 1
+            group_stats.high = max(group_stats.high, article_data["number"])
+
+    def articles_expired(
+        self, numbers: List[Tuple[int, int]], low_water: Dict[int, Optional[int]]
+    ) -> None:
+        """
+        Updates the watermarks after articles have been deleted by expiry.
+
+        Args:
+            numbers: (newsgroup id, number) of every deleted article
+            low_water: the lowest number left in every affected group after the deletion, None if
+                the group is empty now
+        """
+        for group_id, _ in numbers:
+            group_stats: Optional[GroupWatermarks] = self._watermarks.get(group_id)
+            if group_stats is not None:
+                group_stats.count -= 1
+        for group_id, low in low_water.items():
+            group_stats = self._watermarks.get(group_id)
+            if group_stats is None:
+                continue
+            if low is None or group_stats.count <= 0:
+                self._watermarks[group_id] = GroupWatermarks()
+            else:
+                group_stats.low = low
+
+    async def refresh(self, group_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Recomputes the watermarks of the passed groups (or all groups) from the DB in one
+        aggregate query.
+        """
+        query = Article.annotate(count=Count("id"), low=Min("number"), high=Max("number")).group_by(
+            "newsgroup_id"
+        )
+        if group_ids is not None:
+            group_ids = set(group_ids)
+            if len(group_ids) == 0:
+                return
+            query = query.filter(newsgroup_id__in=group_ids)
+        else:
+            group_ids = set(group.id for group in self._groups.values())
+
+        for group_id in group_ids:
+            self._watermarks[group_id] = GroupWatermarks()
+        for row in await query.values("newsgroup_id", "count", "low", "high"):
+            self._watermarks[row["newsgroup_id"]] = GroupWatermarks(
+                count=row["count"], low=row["low"], high=row["high"]
+            )
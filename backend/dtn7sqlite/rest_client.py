@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List
+
+from py_dtn7 import DTNRESTClient
+
+
+class AsyncDTNRESTClient:
+    """
+    Asyncio facade for the synchronous py_dtn7 DTNRESTClient.
+
+    The py_dtn7 client is built on requests and blocks for the duration of every HTTP round trip.
+    Calling it directly on the event loop stalls every connected NNTP reader, so all calls are
+    handed off to a bounded thread pool instead. The pool size caps the number of concurrent
+    requests against the dtnd.
+    """
+
+    def __init__(self, client: DTNRESTClient, executor: ThreadPoolExecutor):
+        self._client: DTNRESTClient = client
+        self._executor: ThreadPoolExecutor = executor
+
+    @classmethod
+    async def connect(cls, host: str, port: int, executor: ThreadPoolExecutor):
+        """
+        Creates the underlying DTNRESTClient off the event loop. The constructor already contacts
+        the dtnd to fetch the node id, so it raises a ConnectionError when the daemon is down.
+        """
+        loop = asyncio.get_running_loop()
+        client: DTNRESTClient = await loop.run_in_executor(
+            executor, partial(DTNRESTClient, host=host, port=port)
+        )
+        return cls(client=client, executor=executor)
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def register(self, endpoint: str) -> None:
+        await self._run(self._client.register, endpoint=endpoint)
+
+    async def get_filtered_bundles(self, address_part_criteria: str) -> List[str]:
+        return await self._run(
+            self._client.get_filtered_bundles, address_part_criteria=address_part_criteria
+        )
+
+    async def download(self, bundle_id: str) -> bytes:
+        return await self._run(self._client.download, bundle_id=bundle_id)
+
+    async def info(self) -> dict:
+        # info is a property on the synchronous client, so wrap the attribute access
+        return await self._run(lambda: self._client.info)
+
+    @property
+    def node_id(self) -> str:
+        # cached by the synchronous client on construction, no round trip needed
+        return self._client.node_id
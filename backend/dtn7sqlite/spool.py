@@ -0,0 +1,236 @@
+"""
+Delivery of the dtnd message spool.
+
+Every article posted on this server is spooled in the DB until it comes back from the dtnd over
+the WS back-channel. Whatever is still in the spool after a (re)connect to the dtnd is sent again
+by SpoolDelivery.
+"""
+
+import asyncio
+import heapq
+import time
+from asyncio import Semaphore, Task
+from datetime import datetime
+from logging import Logger
+from typing import AsyncIterator, Awaitable, Callable, List, Set, Tuple
+
+from tortoise import Tortoise
+
+from backend.dtn7sqlite.db import WRITER
+from backend.dtn7sqlite.models import DTNMessage
+
+SPOOL_FIELDS: Tuple[str, ...] = (
+    "id",
+    "source",
+    "destination",
+    "data",
+    "hash",
+    "delivery_notification",
+    "lifetime",
+    "retries",
+)
+
+_RECORD_FAILURE: str = (
+    'UPDATE "dtn_spool" SET "retries" = "retries" + 1,'
+    ' "error_log" = COALESCE("error_log", \'\') || ? WHERE "hash" = ?'
+)
+
+
+async def record_spool_failures(failures: List[Tuple[str, str]]) -> None:
+    """
+    Counts a failed delivery attempt for every passed spool entry and appends the error to its
+    error log, all in one transaction.
+
+    Args:
+        failures: spool hash and error message of every failed attempt
+    """
+    if len(failures) == 0:
+        return
+    now: str = datetime.utcnow().isoformat()
+    await Tortoise.get_connection(WRITER).execute_many(
+        _RECORD_FAILURE,
+        [
+            [f"\n{now} ERROR Failure delivering to DTNd: {error}", spool_hash]
+            for spool_hash, error in failures
+        ],
+    )
+
+
+async def iter_spool(page_size: int) -> AsyncIterator[List[dict]]:
+    """
+    Pages through the spool by id, page_size entries per query.
+    """
+    last: int = 0
+    while True:
+        page: List[dict] = (
+            await DTNMessage.filter(id__gt=last)
+            .order_by("id")
+            .limit(page_size)
+            .values(*SPOOL_FIELDS)
+        )
+        if len(page) == 0:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last = page[-1]["id"]
+
+
+class SpoolStats:
+    """
+    Counters of a spool delivery run.
+    """
+
+    def __init__(self):
+        self.sent: int = 0
+        self.failed: int = 0
+        self.retried: int = 0
+        self.given_up: int = 0
+        self.started: float = time.monotonic()
+        self.finished: float = 0.0
+
+    def __str__(self) -> str:
+        elapsed: float = (self.finished or time.monotonic()) - self.started
+        return (
+            f"{self.sent} sent, {self.failed} failed attempts, {self.retried} retries,"
+            f" {self.given_up} left for the next reconnect, {elapsed:.1f}s"
+        )
+
+
+class SpoolDelivery:
+    """
+    Streams the spool to the dtnd:
+
+        spool pages -> send window -> dtnd
+                            \\-> failed: batched error log update, retry after backoff
+
+    The spool is read page by page, so only about one page of entries is held in memory no matter
+    how large the spool has grown while the dtnd was unreachable. Up to window sends run
+    concurrently, and rate caps the sends per second if it is not 0.
+
+    A failed send is retried after initial_wait * 2**retries seconds, capped at max_wait, where
+    retries is the number of failed attempts of the entry so far, so entries that keep failing
+    across reconnects back off further. After max_retries failed attempts in one run, an entry is
+    left in the spool for the next reconnect. Failed attempts are written to the spool entries
+    once per page in a single transaction. The run stops early once the dtnd connection is gone.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[dict], Awaitable[None]],
+        connected: Callable[[], bool],
+        logger: Logger,
+        page_size: int,
+        window: int,
+        rate: float,
+        initial_wait: float,
+        max_wait: float,
+        max_retries: int,
+    ):
+        self._send = send
+        self._connected = connected
+        self._logger = logger
+        self._page_size: int = max(1, page_size)
+        self._window: Semaphore = Semaphore(max(1, window))
+        self._interval: float = 1 / rate if rate > 0 else 0.0
+        self._initial_wait: float = initial_wait
+        self._max_wait: float = max_wait
+        self._max_retries: int = max_retries
+        self._next_send: float = 0.0
+        self._sends: Set[Task] = set()
+        # (due time, spool id, entry, failed attempts in this run)
+        self._retries: List[Tuple[float, int, dict, int]] = []
+        self._failures: List[Tuple[str, str]] = []
+        self.stats: SpoolStats = SpoolStats()
+
+    async def run(self) -> SpoolStats:
+        self.stats = SpoolStats()
+        self._logger.info("Sending spooled messages to DTNd")
+        try:
+            async for page in iter_spool(self._page_size):
+                for msg in page:
+                    if not await self._start_send(msg, attempt=0):
+                        return self.stats
+                await self._send_due_retries(wait=False)
+                await self._flush_failures()
+            await self._send_due_retries(wait=True)
+        finally:
+            if len(self._sends) > 0:
+                await asyncio.gather(*self._sends)
+            await self._flush_failures()
+            self.stats.given_up += len(self._retries)
+            self._retries = []
+            self.stats.finished = time.monotonic()
+            self._logger.info("Done sending spooled messages to DTNd: %s", self.stats)
+        return self.stats
+
+    async def _start_send(self, msg: dict, attempt: int) -> bool:
+        if not self._connected():
+            self._logger.warning("Lost connection to DTNd, the rest of the spool is sent later")
+            return False
+        await self._window.acquire()
+        now: float = time.monotonic()
+        if self._next_send > now:
+            await asyncio.sleep(self._next_send - now)
+        self._next_send = max(now, self._next_send) + self._interval
+        task: Task = asyncio.create_task(self._deliver(msg, attempt))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+        return True
+
+    async def _deliver(self, msg: dict, attempt: int) -> None:
+        try:
+            await self._send(msg)
+            self.stats.sent += 1
+        except Exception as e:  # noqa E722
+            self.stats.failed += 1
+            self._failures.append((msg["hash"], str(e)))
+            msg["retries"] += 1
+            if attempt + 1 >= self._max_retries:
+                self.stats.given_up += 1
+                self._logger.warning(
+                    "Giving up on spooled message %s for now after %d failed attempts: %s",
+                    msg["hash"],
+                    attempt + 1,
+                    e,
+                )
+            else:
+                wait: float = min(self._initial_wait * 2 ** msg["retries"], self._max_wait)
+                heapq.heappush(
+                    self._retries, (time.monotonic() + wait, msg["id"], msg, attempt + 1)
+                )
+        finally:
+            self._window.release()
+
+    async def _send_due_retries(self, wait: bool) -> None:
+        """
+        Resends the failed entries whose backoff has passed. With wait, keeps going until there are
+        no more retries pending, sleeping until the next one is due.
+        """
+        while True:
+            if wait and len(self._retries) == 0 and len(self._sends) > 0:
+                # running sends may still fail and add retries
+                await asyncio.wait(self._sends)
+                continue
+            if len(self._retries) == 0:
+                return
+            due: float = self._retries[0][0]
+            if due > time.monotonic():
+                if not wait:
+                    return
+                await self._flush_failures()
+                await asyncio.sleep(due - time.monotonic())
+            _, _, msg, attempt = heapq.heappop(self._retries)
+            self.stats.retried += 1
+            if not await self._start_send(msg, attempt):
+                return
+
+    async def _flush_failures(self) -> None:
+        failures: List[Tuple[str, str]] = self._failures
+        self._failures = []
+        try:
+            await record_spool_failures(failures)
+        except Exception as e:  # noqa E722
+            self._logger.warning(
+                "Could not update the error log of %d spool entries: %s", len(failures), e
+            )
@@ -0,0 +1,75 @@
+"""
+Helpers for multi-line responses that are streamed to the client instead of being built up as a
+complete list of lines first.
+
+A command handler can return an async iterator of lines in place of a List[str]. The server writes
+the lines as they are produced and terminates the response, see AsyncNNTPServer.send_stream.
+"""
+
+from typing import AsyncIterator, Callable, List, Optional
+
+from backend.dtn7sqlite.config import config
+from backend.dtn7sqlite.models import Newsgroup, Overview
+
+
+async def iter_article_range(
+    group: Newsgroup, start: int, stop: int, *fields: str
+) -> AsyncIterator[List[dict]]:
+    """
+    Fetches the passed overview fields of the articles start to stop of a group in chunks of
+    backend.fetch_chunk_size rows. Every chunk is a single keyset query on the
+    (newsgroup_id, number) index of the overview table, so only one chunk of rows is held in
+    memory at any time, no query has to skip over the rows already sent and article bodies are
+    never read.
+
+    Yields:
+        lists of row dicts ordered by article number, each containing "number" and the passed
+        fields
+    """
+    chunk_size: int = max(1, config["backend"]["fetch_chunk_size"])
+    fields = tuple(fields) if "number" in fields else ("number",) + tuple(fields)
+    last: int = start - 1
+    while last < stop:
+        rows: List[dict] = (
+            await Overview.filter(newsgroup_id=group.id, number__gt=last, number__lte=stop)
+            .order_by("number")
+            .limit(chunk_size)
+            .values(*fields)
+        )
+        if len(rows) == 0:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]["number"]
+
+
+async def _render_lines(
+    status_line: str,
+    first_chunk: List[dict],
+    chunks: AsyncIterator[List[dict]],
+    render: Callable[[dict], str],
+) -> AsyncIterator[str]:
+    yield status_line
+    for row in first_chunk:
+        yield render(row)
+    async for chunk in chunks:
+        for row in chunk:
+            yield render(row)
+
+
+async def stream_rows(
+    status_line: str, chunks: AsyncIterator[List[dict]], render: Callable[[dict], str]
+) -> Optional[AsyncIterator[str]]:
+    """
+    Turns chunks of rows into a streamed multi-line response. The first chunk is fetched right
+    away, so the caller can still answer with an error status if there are no rows at all.
+
+    Returns:
+        the response lines starting with status_line, or None if chunks is empty
+    """
+    try:
+        first_chunk: List[dict] = await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+    return _render_lines(status_line, first_chunk, chunks, render)
@@ -1,9 +1,10 @@
-from datetime import datetime, timedelta
+import zlib
+from datetime import datetime, timedelta, timezone
 from hashlib import sha256
-from typing import List
+from typing import List, Optional
 
 from backend.dtn7sqlite.config import config
-from backend.dtn7sqlite.models import Article, Newsgroup
+from backend.dtn7sqlite.models import Newsgroup
 
 
 async def get_all_newsgroups() -> dict:
@@ -18,6 +19,58 @@ def get_article_hash(source: str, destination: str, data: dict) -> str:
     ).hexdigest()
 
 
+def add_overview_stats(article_data: dict) -> dict:
+    """
+    Adds the byte and line count of an article to its decoded data, for the overview row of the
+    article (see ingest.overview_row), so the overview can be served without touching the body.
+    Must be kept in line with migration 2 in migrations.py, which computes the same values for
+    articles stored before.
+    """
+    body: str = article_data["body"]
+    article_data["byte_count"] = sum(
+        len(value.encode("utf-8"))
+        for value in (
+            article_data["from_"],
+            article_data["subject"],
+            article_data["message_id"],
+            article_data.get("references") or "",
+            body,
+        )
+    )
+    article_data["line_count"] = body.count("\n") + 1
+    return article_data
+
+
+def compress_body(article_data: dict, compressed: Optional[bytes] = None) -> dict:
+    """
+    Moves the body of an article's decoded data to body_z, zlib compressed, if
+    backend.compress_bodies is on. Must be called after add_overview_stats, which needs the
+    uncompressed body.
+
+    Args:
+        article_data: the decoded article
+        compressed: the body as compressed in the bundle payload, if it was. It is stored as it is
+                    instead of compressing the body again.
+    """
+    if not config["backend"]["compress_bodies"]:
+        return article_data
+    article_data["body_z"] = (
+        compressed if compressed is not None else zlib.compress(article_data["body"].encode())
+    )
+    article_data["body"] = ""
+    return article_data
+
+
+def article_body(row: dict) -> str:
+    """
+    Returns the body of an article row with the body and body_z fields, decompressed if it was
+    stored compressed.
+    """
+    if row["body_z"] is not None:
+        return zlib.decompress(row["body_z"]).decode()
+    return row["body"]
+
+
 def _bundleid_to_messageid(bid: str) -> str:
     """ """
     bid_data: List[str] = bid.rsplit(sep="-", maxsplit=2)
@@ -25,11 +78,8 @@ def _bundleid_to_messageid(bid: str) -> str:
     return f"<{bid_data[-2]}-{bid_data[-1]}@{src_like}.dtn>"
 
 
-async def _delete_expired_articles() -> int:
-    cutoff_dt: datetime = datetime.utcnow() - timedelta(
-        milliseconds=config["usenet"]["expiry_time"]
-    )
-    return await Article.filter(created_at__lt=cutoff_dt).delete()
+def _expiry_cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(milliseconds=config["usenet"]["expiry_time"])
 
 
 def _bp7sender_to_nntpfrom(sender: str) -> str:
@@ -0,0 +1,114 @@
+"""
+Compares the size of the DB and the cost of reading bodies with backend.compress_bodies off and on.
+
+Builds a throwaway DB per mode, fills it with the same synthetic articles and prints the size of
+the DB file, the pages it takes and the mean time to load and decompress a body as BODY does.
+
+Run from the repository root:
+
+    python benchmarks/body_storage.py --articles 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from tortoise import BaseDBAsyncClient, Tortoise
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.dtn7sqlite.config import config  # noqa: E402
+from backend.dtn7sqlite.models import Article, Newsgroup  # noqa: E402
+from backend.dtn7sqlite.utils import (  # noqa: E402
+    add_overview_stats,
+    article_body,
+    compress_body,
+)
+
+WORDS: List[str] = (
+    "the a node bundle delay tolerant network news article reply group offline sync radio link"
+    " village school clinic message store forward battery solar antenna weather market"
+).split()
+
+
+def synthetic_body(rng: random.Random) -> str:
+    lines: List[str] = [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12)))
+        for _ in range(rng.randint(5, 60))
+    ]
+    # quoted text, as most replies have
+    return "\n".join(lines[:3] + [f"> {line}" for line in lines[3:]])
+
+
+async def fill(articles: int, compress: bool, now: datetime) -> None:
+    config["backend"]["compress_bodies"] = compress
+    group: Newsgroup = await Newsgroup.create(name="bench.bodies")
+    rng: random.Random = random.Random(42)
+    batch: List[Article] = []
+    for a in range(articles):
+        article_data: dict = {
+            "newsgroup": group,
+            "number": a + 1,
+            "from_": "bench@example.org",
+            "subject": f"subject {a}",
+            "created_at": now,
+            "message_id": f"<{a}@bench>",
+            "body": synthetic_body(rng),
+            "references": "",
+        }
+        batch.append(Article(**compress_body(add_overview_stats(article_data))))
+    await Article.bulk_create(batch, batch_size=1000)
+
+
+async def pragma(connection: BaseDBAsyncClient, name: str) -> int:
+    return (await connection.execute_query_dict(f"PRAGMA {name}"))[0][name]
+
+
+async def report(db_path: str, articles: int, repeat: int) -> None:
+    connection: BaseDBAsyncClient = Tortoise.get_connection("default")
+    await connection.execute_query("VACUUM")
+    # the DB runs in WAL mode, move everything into the DB file before measuring it
+    await connection.execute_query("PRAGMA wal_checkpoint(TRUNCATE)")
+    pages: int = await pragma(connection, "page_count")
+    ids: List[int] = random.Random(7).sample(range(1, articles + 1), min(repeat, articles))
+    started: float = time.perf_counter()
+    for article_id in ids:
+        row: dict = await Article.filter(id=article_id).first().values("body", "body_z")
+        article_body(row)
+    mean_ms: float = (time.perf_counter() - started) * 1000 / len(ids)
+    print(
+        f"  {os.path.getsize(db_path) / 1024 / 1024:9.2f} MiB  {pages:8d} pages"
+        f"  {mean_ms:7.3f} ms per body"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    # the debug logging of the DB driver would drown the report
+    logging.disable(logging.INFO)
+    now: datetime = datetime.now(timezone.utc)
+    print(f"{args.articles} articles, mean of {args.repeat} body reads")
+    for compress in (False, True):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path: str = os.path.join(tmp_dir, "bench.sqlite3")
+            await Tortoise.init(
+                db_url=f"sqlite://{db_path}", modules={"models": ["backend.dtn7sqlite.models"]}
+            )
+            await Tortoise.generate_schemas()
+            await fill(args.articles, compress, now)
+            print("compressed bodies:" if compress else "plain bodies:")
+            await report(db_path, args.articles, args.repeat)
+            await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DB size with plain and compressed bodies")
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
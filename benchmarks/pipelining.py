@@ -0,0 +1,90 @@
+"""
+Measures the throughput of a HEAD sweep over a newsgroup on a running server, once in lock-step
+(send a command, wait for its reply, send the next) and once pipelined (keep --window commands in
+flight), which is what newsreaders do when they fetch headers of a whole group.
+
+Run from the repository root against a running server:
+
+    python benchmarks/pipelining.py --port 1190 --group monntpy.dev --window 32
+"""
+
+import argparse
+import asyncio
+import time
+from asyncio import StreamReader, StreamWriter
+from typing import List, Tuple
+
+# status codes of multi-line replies that may come back for HEAD
+_MULTI_LINE: Tuple[bytes, ...] = (b"221",)
+
+
+async def read_reply(reader: StreamReader) -> bytes:
+    status: bytes = await reader.readline()
+    if status[:3] in _MULTI_LINE:
+        while await reader.readline() != b".\r\n":
+            pass
+    return status[:3]
+
+
+async def select_group(reader: StreamReader, writer: StreamWriter, group: str) -> Tuple[int, int]:
+    writer.write(f"GROUP {group}\r\n".encode())
+    status: List[str] = (await reader.readline()).decode().split()
+    if status[0] != "211":
+        raise SystemExit(f"Could not select group {group}: {' '.join(status)}")
+    return int(status[2]), int(status[3])
+
+
+async def lock_step(reader: StreamReader, writer: StreamWriter, numbers: range) -> float:
+    started: float = time.perf_counter()
+    for number in numbers:
+        writer.write(f"HEAD {number}\r\n".encode())
+        await read_reply(reader)
+    return time.perf_counter() - started
+
+
+async def pipelined(
+    reader: StreamReader, writer: StreamWriter, numbers: range, window: int
+) -> float:
+    started: float = time.perf_counter()
+    in_flight: int = 0
+    for number in numbers:
+        writer.write(f"HEAD {number}\r\n".encode())
+        in_flight += 1
+        if in_flight == window:
+            await writer.drain()
+            await read_reply(reader)
+            in_flight -= 1
+    await writer.drain()
+    for _ in range(in_flight):
+        await read_reply(reader)
+    return time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    await reader.readline()
+    low, high = await select_group(reader, writer, args.group)
+    numbers: range = range(low, min(high, low + args.count - 1) + 1)
+    print(f"HEAD sweep over {len(numbers)} articles of {args.group}")
+
+    for name, sweep in [
+        ("lock-step", lambda: lock_step(reader, writer, numbers)),
+        (f"pipelined ({args.window})", lambda: pipelined(reader, writer, numbers, args.window)),
+    ]:
+        elapsed: float = min([await sweep() for _ in range(args.repeat)])
+        print(f"  {name:<16}{elapsed * 1000:9.1f} ms  {len(numbers) / elapsed:9.0f} commands/s")
+
+    writer.write(b"QUIT\r\n")
+    await reader.readline()
+    writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lock-step vs pipelined HEAD sweep")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1190)
+    parser.add_argument("--group", required=True)
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--window", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+"""
+Shows how the hot queries of the backend are planned and how long they take, with and without the
+secondary indexes added in schema version 3.
+
+Builds a throwaway DB with the current schema, fills it with synthetic groups, articles and spool
+entries and prints SQLite's EXPLAIN QUERY PLAN and the mean run time of every query, first with
+all indexes, then after dropping the secondary ones. Without them, janitor expiry, the group
+lookup by name and the spool delete SCAN their tables, NEWGROUPS scans the groups as well and
+NEWNEWS falls back to the (newsgroup_id, number) index, checking created_at on every article of the
+group. OVER is not affected, it always reads the overview table by (newsgroup_id, number).
+
+Run from the repository root:
+
+    python benchmarks/query_plans.py --articles 200000 --groups 200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Tuple
+
+from tortoise import BaseDBAsyncClient, Tortoise
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.dtn7sqlite.models import (  # noqa: E402
+    Article,
+    DTNMessage,
+    Newsgroup,
+    Overview,
+)
+
+SECONDARY_INDEXES: List[str] = [
+    "idx_article_created_13707c",
+    "idx_newsgroup_name_00be84",
+    "idx_newsgroup_created_a9aefc",
+    "idx_dtn_spool_hash_c43457",
+]
+
+
+def hot_queries(now: datetime, groups: int) -> List[Tuple[str, str]]:
+    # The SQL is generated from the same querysets the backend runs, deletes are benchmarked as
+    # the equivalent SELECT so the data stays the same between runs.
+    return [
+        (
+            "janitor expiry",
+            Article.filter(created_at__lt=now - timedelta(days=300)).values_list("id").sql(),
+        ),
+        (
+            "NEWNEWS",
+            Article.filter(
+                created_at__gte=now - timedelta(hours=1), newsgroup_id__in=list(range(1, 11))
+            )
+            .values_list("message_id")
+            .sql(),
+        ),
+        (
+            "OVER range",
+            Overview.filter(newsgroup_id=1, number__gt=100, number__lte=200)
+            .order_by("number")
+            .values_list("number", "subject", "byte_count", "line_count")
+            .sql(),
+        ),
+        (
+            "group by name",
+            Newsgroup.filter(name=f"bench.group{groups // 2}").values_list("id").sql(),
+        ),
+        (
+            "NEWGROUPS",
+            Newsgroup.filter(created_at__gte=now - timedelta(days=1)).values_list("name").sql(),
+        ),
+        (
+            "spool delete",
+            DTNMessage.filter(hash__in=[f"{i:064x}" for i in range(0, 1000, 100)])
+            .values_list("id")
+            .sql(),
+        ),
+    ]
+
+
+async def fill(connection: BaseDBAsyncClient, articles: int, groups: int, now: datetime) -> None:
+    start: datetime = now - timedelta(days=365)
+    await connection.execute_many(
+        (
+            'INSERT INTO "newsgroup" ("name", "description", "status", "default_subscribe",'
+            ' "high_water", "created_at", "updated_at") VALUES (?, ?, ?, ?, ?, ?, ?)'
+        ),
+        [[f"bench.group{g}", "", "y", 0, 0, start + timedelta(days=g), now] for g in range(groups)],
+    )
+    step: timedelta = (now - start) / articles
+    await connection.execute_many(
+        (
+            'INSERT INTO "article" ("id", "from", "created_at", "subject", "message_id", "body",'
+            ' "newsgroup_id", "number") VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+        ),
+        [
+            [
+                a + 1,
+                "bench@example.org",
+                start + a * step,
+                f"subject {a}",
+                f"<{a}@bench>",
+                "body",
+                a % groups + 1,
+                a // groups + 1,
+            ]
+            for a in range(articles)
+        ],
+    )
+    await connection.execute_query(
+        'INSERT INTO "overview" ("article_id", "newsgroup_id", "number", "subject", "from",'
+        ' "created_at", "message_id", "byte_count", "line_count") SELECT "id", "newsgroup_id",'
+        ' "number", "subject", "from", "created_at", "message_id", 0, 1 FROM "article"'
+    )
+    await connection.execute_many(
+        (
+            'INSERT INTO "dtn_spool" ("source", "destination", "data", "delivery_notification",'
+            ' "lifetime", "retries", "hash", "created_at") VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+        ),
+        [
+            ["dtn://bench/", "dtn://groups/", "{}", 0, 86400000, 0, f"{i:064x}", now]
+            for i in range(articles // 10)
+        ],
+    )
+    await connection.execute_query("ANALYZE")
+
+
+async def report(
+    connection: BaseDBAsyncClient, queries: List[Tuple[str, str]], repeat: int
+) -> None:
+    for name, sql in queries:
+        plan: List[dict] = await connection.execute_query_dict(f"EXPLAIN QUERY PLAN {sql}")
+        started: float = time.perf_counter()
+        for _ in range(repeat):
+            await connection.execute_query(sql)
+        mean_ms: float = (time.perf_counter() - started) * 1000 / repeat
+        print(f"  {name:<16}{mean_ms:9.3f} ms  " + "; ".join(row["detail"] for row in plan))
+
+
+async def main(args: argparse.Namespace) -> None:
+    # the debug logging of the DB driver would drown the report
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await Tortoise.init(
+            db_url=f"sqlite://{os.path.join(tmp_dir, 'bench.sqlite3')}",
+            modules={"models": ["backend.dtn7sqlite.models"]},
+        )
+        await Tortoise.generate_schemas()
+        connection: BaseDBAsyncClient = Tortoise.get_connection("default")
+        now: datetime = datetime.now(timezone.utc)
+        await fill(connection, args.articles, args.groups, now)
+        queries: List[Tuple[str, str]] = hot_queries(now, args.groups)
+
+        print(f"{args.articles} articles in {args.groups} groups, mean of {args.repeat} runs")
+        print("with secondary indexes:")
+        await report(connection, queries, args.repeat)
+        for index in SECONDARY_INDEXES:
+            await connection.execute_query(f'DROP INDEX "{index}"')
+        await connection.execute_query("ANALYZE")
+        print("without secondary indexes:")
+        await report(connection, queries, args.repeat)
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query plans of the hot backend queries")
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -1,16 +1,24 @@
+import random
 from asyncio import StreamReader, StreamWriter, wait_for
 from logging import Logger
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Union
 
-from backend.dtn7sqlite.models import Article, Newsgroup
+from backend.dtn7sqlite.lookup import ArticlePointer
+from backend.dtn7sqlite.models import Newsgroup
 from config import server_config
-from logger import global_logger
+from logger import global_logger, protocol_logger
 from status_codes import StatusCodes
-from utils import get_version
+from utils import ArticleParser, get_version
 
 if TYPE_CHECKING:
+    from backend.base import Backend
     from nntp_server import AsyncNNTPServer
 
+# bytes read from the socket at a time
+READ_SIZE: int = 64 * 1024
+# longest line accepted from a client, the same limit asyncio's StreamReader.readline() has
+MAX_LINE_LENGTH: int = 64 * 1024
+
 
 class ClientConnection:
     """
@@ -24,112 +32,204 @@ class ClientConnection:
         self._reader: StreamReader = reader
         self._writer: StreamWriter = writer
         self.logger: Logger = global_logger()
+        # the protocol traffic of this connection is only logged if it has been picked for tracing
+        self._trace_logger: Optional[Logger] = None
+        if random.random() < server_config.get("protocol_trace", 0.0):
+            self._trace_logger = protocol_logger()
+        self._peer: str = str(writer.get_extra_info(name="peername"))
         self._terminated: bool = False
         self._empty_token_counter: int = 0
         self._cmd_args: Optional[List[str]] = None
         self._selected_group: Optional[Newsgroup] = None
-        self._selected_article: Optional[Article] = None
+        self._selected_article: Optional[ArticlePointer] = None
         self._post_mode: bool = False
-        self._article_buffer: List[str] = []
+        self._article_parser: Optional[ArticleParser] = None
+        self._max_article_size: int = server_config.get("max_article_size", 1024 * 1024)
         self._command: str = ""
+        self._read_buffer: bytes = b""
+        self._replies: List[bytes] = []
+        self._replies_size: int = 0
 
     async def handle_client(self) -> None:
         self._terminated = False
         self._empty_token_counter = 0
 
         if server_config["server_type"] == "read-only":
-            self._server.send(
-                writer=self._writer,
-                send_obj=StatusCodes.STATUS_READYNOPOST.substitute(
+            await self._reply(
+                StatusCodes.STATUS_READYNOPOST.substitute(
                     url=server_config["nntp_hostname"], version=get_version()
-                ),
+                )
             )
         else:
-            self._server.send(
-                writer=self._writer,
-                send_obj=StatusCodes.STATUS_READYOKPOST.substitute(
+            await self._reply(
+                StatusCodes.STATUS_READYOKPOST.substitute(
                     url=server_config["nntp_hostname"], version=get_version()
-                ),
+                )
             )
+        await self._flush()
 
         # main execution loop for handling a connection until it's closed
         while not self._terminated:
-            # while True:
             try:
                 # TODO: make timeout a setting
-                incoming_data = await wait_for(self._reader.readline(), timeout=43200.0)
+                lines: Optional[List[bytes]] = await wait_for(self._read_lines(), timeout=43200.0)
             except TimeoutError as e:
-                self.logger.error(f"ERROR: TimeoutError occurred. {e}")
+                self.logger.error("ERROR: TimeoutError occurred. %s", e)
                 continue
+            if lines is None:
+                self.logger.debug("Client closed the connection")
+                break
 
-            self.logger.debug(
-                f"{self._writer.get_extra_info(name='peername')} >"
-                f" {incoming_data.decode(encoding='utf-8').strip()}"
-            )
+            # pipelined commands are all handled before any reply is written, so their replies go
+            # out in as few writes as possible
+            for incoming_data in lines:
+                await self._handle_line(incoming_data)
+                if self._terminated:
+                    break
+            await self._flush()
 
-            if self._post_mode:
-                # only rstrip in order to preserve indentation in body
-                data_decode = incoming_data.decode(encoding="utf-8").rstrip()
-                if data_decode == ".":
-                    try:
-                        await self._server.backend.save_article(article_buffer=self._article_buffer)
-                        self._server.send(
-                            writer=self._writer, send_obj=StatusCodes.STATUS_POSTSUCCESSFUL
-                        )
-                    except Exception as e:  # noqa E722
-                        self.logger.error(e)
-                        self._server.send(
-                            writer=self._writer, send_obj=StatusCodes.ERR_NOTPERFORMED
-                        )
-                    self._post_mode = False
-                    self._article_buffer = []
-                else:
-                    self._article_buffer.append(data_decode)
-                continue
+    async def _read_lines(self) -> Optional[List[bytes]]:
+        """
+        Waits for input and returns all lines received completely so far, i.e. every command a
+        client has pipelined, without the line breaks.
+
+        Returns:
+            the received lines, or None once the client has closed the connection
+        """
+        while b"\n" not in self._read_buffer:
+            if len(self._read_buffer) > MAX_LINE_LENGTH:
+                raise ValueError(f"Line exceeds {MAX_LINE_LENGTH} bytes")
+            data: bytes = await self._reader.read(READ_SIZE)
+            if len(data) == 0:
+                return None
+            self._read_buffer += data
+        lines: List[bytes] = self._read_buffer.split(b"\n")
+        self._read_buffer = lines.pop()
+        return lines
 
+    async def _handle_line(self, incoming_data: bytes) -> None:
+        if self._trace_logger is not None:
+            self._trace_logger.debug(
+                "%s > %s",
+                self._peer,
+                incoming_data.decode(encoding="utf-8", errors="replace").strip(),
+            )
+
+        if self._post_mode:
+            if not self._article_parser.feed(incoming_data):
+                return
+            parser: ArticleParser = self._article_parser
+            self.post_mode = False
+            if parser.too_large:
+                # the client can't be stopped from sending the rest of the article, so it can only
+                # be rejected after the terminating line, but none of it has been kept in memory
+                self.logger.warning(
+                    "Rejecting posted article of %d bytes, the limit is %d bytes",
+                    parser.size,
+                    self._max_article_size,
+                )
+                await self._reply(StatusCodes.ERR_ARTICLETOOLARGE)
+                return
             try:
-                tokens: List[str] = (
-                    incoming_data.decode(encoding="utf-8").strip().lower().split(" ")
+                await self._server.backend.save_article(article=parser.article())
+                await self._reply(StatusCodes.STATUS_POSTSUCCESSFUL)
+            except Exception as e:  # noqa E722
+                self.logger.error(e)
+                await self._reply(StatusCodes.ERR_NOTPERFORMED)
+            return
+
+        try:
+            tokens: List[str] = incoming_data.decode(encoding="utf-8").strip().lower().split(" ")
+        except IOError:
+            return
+
+        if all([t == "" for t in tokens]):
+            self._empty_token_counter += 1
+            if self._empty_token_counter >= server_config["max_empty_requests"]:
+                self.logger.warning(
+                    "WARNING: Noping out because client is sending too many empty requests"
                 )
-            except IOError:
-                continue
+                self._terminated = True
+            return
+        else:
+            self._empty_token_counter = 0
 
-            if all([t == "" for t in tokens]):
-                self._empty_token_counter += 1
-                if self._empty_token_counter >= server_config["max_empty_requests"]:
-                    self.logger.warning(
-                        "WARNING: Noping out because client is sending too many empty requests"
-                    )
-                    self._terminated = True
-                continue
-            else:
-                self._empty_token_counter = 0
-
-            self._command = tokens.pop(0) if len(tokens) > 0 else None
-            self._cmd_args: Optional[List[str]] = tokens
-
-            if self._command in self._server.backend.available_commands:
-                try:
-                    self._server.send(
-                        writer=self._writer,
-                        send_obj=await self._server.backend.call_dict[self._command](self),
-                    )
-                except Exception as e:
-                    self.logger.exception(e)
-                    self._terminated = True
-            else:
-                # command is not in list of implemented capabilities
-                self._server.send(writer=self._writer, send_obj=StatusCodes.ERR_CMDSYNTAXERROR)
-
-            if self._command == "quit":
+        self._command = tokens.pop(0) if len(tokens) > 0 else None
+        self._cmd_args: Optional[List[str]] = tokens
+
+        if self._command in self._server.backend.available_commands:
+            try:
+                response: Union[
+                    List[str], str, bytes, AsyncIterator[str]
+                ] = await self._server.backend.call_dict[self._command](self)
+                await self._reply(response)
+            except Exception as e:
+                self.logger.exception(e)
                 self._terminated = True
+        else:
+            # command is not in list of implemented capabilities
+            await self._reply(StatusCodes.ERR_CMDSYNTAXERROR)
+
+        if self._command == "quit":
+            self._terminated = True
+
+    async def _reply(self, response: Union[List[str], str, bytes, AsyncIterator[str]]) -> None:
+        """
+        Queues a reply to be written with the replies to the other commands of the same pipelined
+        batch. Streamed multi-line responses are written right away, after the queued replies.
+        """
+        if self._trace_logger is not None:
+            response = self._trace_reply(response)
+        if isinstance(response, (str, list, bytes)):
+            encoded: bytes = self._server.encode_response(response)
+            self._replies.append(encoded)
+            self._replies_size += len(encoded)
+            if self._replies_size >= self._server.write_chunk_size:
+                await self._flush()
+        else:
+            # multi-line response streamed by the command handler
+            await self._flush()
+            await self._server.send_stream(writer=self._writer, lines=response)
+
+    def _trace_reply(
+        self, response: Union[List[str], str, bytes, AsyncIterator[str]]
+    ) -> Union[List[str], str, bytes, AsyncIterator[str]]:
+        """
+        Logs a reply to the protocol trace. Streamed responses are wrapped so their lines are
+        logged as they are sent.
+        """
+        if isinstance(response, bytes):
+            self._trace_logger.debug("%s < <%d bytes>", self._peer, len(response))
+        elif isinstance(response, str):
+            self._trace_logger.debug("%s < %s", self._peer, response)
+        elif isinstance(response, list):
+            for line in response:
+                self._trace_logger.debug("%s < %s", self._peer, line)
+            self._trace_logger.debug("%s < .", self._peer)
+        else:
+            return self._trace_stream(response)
+        return response
+
+    async def _trace_stream(self, lines: AsyncIterator[str]) -> AsyncIterator[str]:
+        async for line in lines:
+            self._trace_logger.debug("%s < %s", self._peer, line)
+            yield line
+        self._trace_logger.debug("%s < .", self._peer)
+
+    async def _flush(self) -> None:
+        if len(self._replies) == 0:
+            return
+        replies: bytes = self._replies[0] if len(self._replies) == 1 else b"".join(self._replies)
+        self._replies = []
+        self._replies_size = 0
+        await self._server.write(self._writer, replies)
 
     def stop(self):
         self._writer.close()
 
     @property
-    def article_buffer(self):
-        return self._article_buffer
+    def backend(self) -> "Backend":
+        return self._server.backend
 
     @property
     def cmd_args(self) -> Optional[List[str]]:
@@ -146,9 +246,11 @@ class ClientConnection:
     @post_mode.setter
     def post_mode(self, val) -> None:
         self._post_mode = val
+        # every POST gets a fresh parser
+        self._article_parser = ArticleParser(max_size=self._max_article_size) if val else None
 
     @property
-    def selected_article(self) -> Optional[Article]:
+    def selected_article(self) -> Optional[ArticlePointer]:
         return self._selected_article
 
     @selected_article.setter
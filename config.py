@@ -33,6 +33,9 @@ try:
     server_config = load(config_toml_path)
 except FileNotFoundError:
     logger.error(
-        f"config.{env}.toml not found in same directory as config.py. This error is fatal,"
-        " please fix either the setting in pyproject.toml or the filesystem."
+        (
+            "config.%s.toml not found in same directory as config.py. This error is fatal,"
+            " please fix either the setting in pyproject.toml or the filesystem."
+        ),
+        env,
     )
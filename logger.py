@@ -1,11 +1,57 @@
-import logging
+"""
+Logging is configured from logging_conf.ini exactly once, when this module is first imported.
+
+The handlers configured there don't run on the thread that logs. The root logger only gets a
+_RecordQueueHandler, which puts records on a queue, and a QueueListener thread passes them on to
+the configured handlers. The logging thread only merges the arguments into the message. Applying
+the formatters, rendering tracebacks and writing the output happen on the listener thread, so
+none of that blocks the event loop.
+
+NNTP protocol traffic is logged to the separate "protocol" logger, and only for the share of
+client connections set by protocol_trace in the server config, see ClientConnection.
+"""
 
-# global_logger = multiprocessing.log_to_stderr(logging.DEBUG)
+import atexit
+import copy
+import logging
 from logging.config import fileConfig
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import List
+
+
+class _RecordQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare formats the whole record, traceback included, on the logging thread.
+        # Only the arguments are merged here, so the message shows them as they were at the time of
+        # the call, everything else is left to the handlers on the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
-fileConfig("logging_conf.ini")
+
+def _configure() -> QueueListener:
+    fileConfig("logging_conf.ini", disable_existing_loggers=False)
+    root: logging.Logger = logging.getLogger()
+    handlers: List[logging.Handler] = list(root.handlers)
+    for handler in handlers:
+        root.removeHandler(handler)
+    log_queue: SimpleQueue = SimpleQueue()
+    root.addHandler(_RecordQueueHandler(log_queue))
+    listener: QueueListener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # flushes the records still queued at shutdown
+    atexit.register(listener.stop)
+    return listener
+
+
+_listener: QueueListener = _configure()
 
 
 def global_logger() -> logging.Logger:
-    fileConfig("logging_conf.ini")
     return logging.getLogger()
+
+
+def protocol_logger() -> logging.Logger:
+    return logging.getLogger("protocol")
@@ -11,7 +11,7 @@ from utils import get_version
 if __name__ == "__main__":
     logger = global_logger()
 
-    logger.info(f"moNNT.py Usenet Server {get_version()}")
+    logger.info("moNNT.py Usenet Server %s", get_version())
 
     """
     Required procedure:
@@ -1,12 +1,14 @@
 import asyncio
 from asyncio import StreamReader, StreamWriter, Task
 from logging import Logger
-from typing import List, Optional, Union
+from typing import AsyncIterator, List, Optional, Union
 
 from backend.base import Backend
 from backend.dtn7sqlite.models import Article, Newsgroup
 from client_connection import ClientConnection
+from config import server_config
 from logger import global_logger
+from utils import encode_multiline
 
 
 class AsyncNNTPServer:
@@ -25,21 +27,62 @@ class AsyncNNTPServer:
         self._command: Optional[str]
         self._backend: Optional[Backend] = None
         self._sockserver = None
+        self._write_chunk_size: int = server_config.get("write_chunk_size", 64 * 1024)
+        self._write_buffer_high: int = server_config.get("write_buffer_high", 256 * 1024)
+        self._write_buffer_low: int = server_config.get(
+            "write_buffer_low", self._write_buffer_high // 4
+        )
 
-    def send(self, writer: StreamWriter, send_obj: Union[List[str], str]) -> None:
-        if type(send_obj) is str:
-            self.logger.debug(f"server > {send_obj}")
-            writer.write(f"{send_obj}\r\n".encode(encoding="utf-8"))
+    def encode_response(self, send_obj: Union[List[str], str, bytes]) -> bytes:
+        """
+        Encodes a single-line response or a multi-line response, which is dot-stuffed and
+        terminated here. All lines are joined and encoded in one go. A response passed as bytes is
+        already encoded and terminated and is returned as-is.
+        """
+        if type(send_obj) is bytes:
+            return send_obj
+        elif type(send_obj) is str:
+            return f"{send_obj}\r\n".encode(encoding="utf-8")
         else:
-            send_obj.append(".")
-            for line in send_obj:
-                self.logger.debug(f"server > {line}")
-                writer.write(f"{line}\r\n".encode(encoding="utf-8"))
+            return encode_multiline(send_obj)
+
+    async def send_stream(self, writer: StreamWriter, lines: AsyncIterator[str]) -> None:
+        """
+        Sends a multi-line response whose lines are produced by an async iterator, dot-stuffed and
+        terminated. Lines are collected into buffers of write_chunk_size bytes, so only about one
+        buffer of the response is held in memory beyond what the transport buffer allows.
+        """
+        buffer: List[str] = []
+        buffered: int = 0
+        async for line in lines:
+            buffer.append(line)
+            buffered += len(line) + 2
+            if buffered >= self._write_chunk_size:
+                await self.write(writer, encode_multiline(buffer, terminate=False))
+                buffer = []
+                buffered = 0
+        await self.write(writer, encode_multiline(buffer) if len(buffer) > 0 else b".\r\n")
+
+    async def write(self, writer: StreamWriter, data: bytes) -> None:
+        """
+        Writes encoded responses in chunks of write_chunk_size bytes, waiting for the socket to
+        drain whenever the transport buffer is above its high-water mark.
+        """
+        view: memoryview = memoryview(data)
+        for offset in range(0, len(view), self._write_chunk_size):
+            end: int = offset + self._write_chunk_size
+            writer.write(view[offset:end])
+            # only blocks while the transport buffer is above its high-water mark
+            await writer.drain()
 
     async def _accept_client(self, reader: StreamReader, writer: StreamWriter) -> None:
         """
         Accepts a new client and transfers control of the reader and writer to it
         """
+        # cap the memory a slow reader can tie up in its transport buffer
+        writer.transport.set_write_buffer_limits(
+            high=self._write_buffer_high, low=self._write_buffer_low
+        )
         client_conn: ClientConnection = ClientConnection(server=self, reader=reader, writer=writer)
         task: Task = asyncio.create_task(client_conn.handle_client())
         self.clients[task] = (reader, writer)
@@ -54,7 +97,7 @@ class AsyncNNTPServer:
         addr: str
         port: int
         addr, port = writer.get_extra_info(name="peername")
-        self.logger.info(f"Connected to client at {addr}:{port}")
+        self.logger.info("Connected to client at %s:%s", addr, port)
 
     async def start_serving(self):
         self._sockserver = await asyncio.start_server(
@@ -81,6 +124,10 @@ class AsyncNNTPServer:
     def backend(self, new_backend: Backend):
         self._backend = new_backend
 
+    @property
+    def write_chunk_size(self) -> int:
+        return self._write_chunk_size
+
     @property
     def terminated(self) -> bool:
         return self._terminated
@@ -22,6 +22,7 @@ class StatusCodes:
     ERR_NOTCAPABLE: str = "500 command not recognized"
     ERR_NOTPERFORMED: str = "503 program error, function not performed"
     ERR_POSTINGFAILED: str = "441 Posting failed"
+    ERR_ARTICLETOOLARGE: str = "441 Article too large"
     STATUS_AUTH_ACCEPTED: str = "281 Authentication accepted"
     STATUS_AUTH_CONTINUE: str = "381 More authentication information required"
     STATUS_AUTH_REQUIRED: str = "480 Authentication required"
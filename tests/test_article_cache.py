@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from backend.dtn7sqlite.article_cache import ArticleCache, RenderedArticle
+
+EPOCH: datetime = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+def _article(number: int, group_id: int = 1, size: int = 100, age: int = 0) -> RenderedArticle:
+    # header and body split the size evenly
+    return RenderedArticle(
+        id=group_id * 1000 + number,
+        number=number,
+        message_id=f"<{number}@{group_id}>",
+        group_id=group_id,
+        created_at=EPOCH - timedelta(days=age),
+        head=b"h" * (size // 2),
+        body=b"b" * (size - size // 2),
+    )
+
+
+def _assert_consistent(cache: ArticleCache) -> None:
+    entries = list(cache._entries.values())
+    assert cache.size == sum(entry.size for entry in entries)
+    assert cache.size <= cache.max_bytes
+    assert cache._numbers == {(e.group_id, e.number): e.message_id for e in entries}
+
+
+def test_lookup_by_message_id_and_number():
+    cache: ArticleCache = ArticleCache(max_bytes=1000)
+    article: RenderedArticle = _article(1)
+    cache.put(article)
+    assert cache.get("<1@1>") is article
+    assert cache.get_by_number(1, 1) is article
+    assert cache.get("<2@1>") is None
+    assert cache.get_by_number(2, 1) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_head_only_entries_count_without_body():
+    article: RenderedArticle = _article(1, size=100)
+    article.body = None
+    assert article.size == 50
+    assert article.with_body("body").body == b"body\r\n"
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache: ArticleCache = ArticleCache(max_bytes=300)
+    for number in (1, 2, 3):
+        cache.put(_article(number))
+    # a lookup makes 1 the most recently used
+    cache.get("<1@1>")
+    cache.put(_article(4))
+    assert cache.get("<2@1>") is None
+    assert [e.number for e in cache._entries.values()] == [3, 1, 4]
+
+    # a large article evicts as many old ones as needed
+    cache.put(_article(5, size=250))
+    assert [e.number for e in cache._entries.values()] == [5]
+    _assert_consistent(cache)
+
+
+def test_replacing_an_entry_keeps_size_and_numbers_in_sync():
+    cache: ArticleCache = ArticleCache(max_bytes=1000)
+    cache.put(_article(1, size=100))
+    head_only: RenderedArticle = _article(1, size=100)
+    head_only.body = None
+    cache.put(head_only)
+    assert len(cache) == 1
+    assert cache.size == 50
+    cache.put(_article(1, size=100))
+    assert cache.size == 100
+    _assert_consistent(cache)
+
+
+def test_evicted_entries_leave_the_number_index():
+    cache: ArticleCache = ArticleCache(max_bytes=200)
+    for number in range(1, 6):
+        cache.put(_article(number))
+        _assert_consistent(cache)
+    assert cache.get_by_number(1, 1) is None
+    assert cache.get_by_number(1, 5) is not None
+    cache.invalidate(["<5@1>", "<unknown@1>"])
+    assert cache.get_by_number(1, 5) is None
+    _assert_consistent(cache)
+
+
+def test_entries_larger_than_the_cache_are_not_stored():
+    cache: ArticleCache = ArticleCache(max_bytes=100)
+    cache.put(_article(1, size=50))
+    cache.put(_article(2, size=101))
+    assert len(cache) == 1
+    assert cache.get("<2@1>") is None
+    _assert_consistent(cache)
+
+
+def test_max_bytes_zero_switches_the_cache_off():
+    cache: ArticleCache = ArticleCache(max_bytes=0)
+    cache.put(_article(1))
+    empty: RenderedArticle = _article(2, size=0)
+    empty.body = None
+    cache.put(empty)
+    assert len(cache) == 0
+    assert cache.get("<1@1>") is None
+    assert cache.size == 0
+
+
+def test_expire_drops_articles_created_before_cutoff():
+    cache: ArticleCache = ArticleCache(max_bytes=1000)
+    for number, age in ((1, 10), (2, 5), (3, 1)):
+        cache.put(_article(number, age=age))
+    cache.expire(EPOCH - timedelta(days=5))
+    assert [e.number for e in cache._entries.values()] == [2, 3]
+    assert cache.get_by_number(1, 1) is None
+    _assert_consistent(cache)
+
+
+def test_remove_group_drops_only_its_articles():
+    cache: ArticleCache = ArticleCache(max_bytes=1000)
+    for group_id in (1, 2):
+        for number in (1, 2):
+            cache.put(_article(number, group_id=group_id))
+    cache.remove_group(1)
+    assert sorted(e.group_id for e in cache._entries.values()) == [2, 2]
+    remaining: Optional[RenderedArticle] = cache.get_by_number(2, 1)
+    assert remaining is not None and remaining.message_id == "<1@2>"
+    assert cache.get_by_number(1, 1) is None
+    _assert_consistent(cache)
+
+    cache.clear()
+    assert (len(cache), cache.size, cache._numbers) == (0, 0, {})
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Callable, Dict, List
+
+from backend.dtn7sqlite.nntp_commands.post import do_post
+from client_connection import ClientConnection
+from nntp_server import AsyncNNTPServer
+from utils import PostedArticle
+
+
+class ChunkedReader:
+    """
+    Returns the passed chunks one per read, like a socket that receives them one after the other.
+    """
+
+    def __init__(self, chunks: List[bytes]):
+        self._chunks: List[bytes] = list(chunks)
+
+    async def read(self, n: int) -> bytes:
+        await asyncio.sleep(0)
+        return self._chunks.pop(0) if len(self._chunks) > 0 else b""
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.data: bytearray = bytearray()
+
+    def write(self, data: bytes) -> None:
+        self.data += data
+
+    async def drain(self) -> None:
+        pass
+
+    def get_extra_info(self, name: str) -> str:
+        return "test-peer"
+
+
+class PostingBackend:
+    def __init__(self):
+        self.saved: List[PostedArticle] = []
+        self.call_dict: Dict[str, Callable] = {"post": do_post}
+        self.available_commands: List[str] = list(self.call_dict)
+
+    async def save_article(self, article: PostedArticle) -> None:
+        self.saved.append(article)
+
+
+def _session(chunks: List[bytes], backend: PostingBackend, max_article_size: int) -> List[str]:
+    server: AsyncNNTPServer = AsyncNNTPServer(hostname="localhost", port=0)
+    server.backend = backend
+    writer: RecordingWriter = RecordingWriter()
+    client_conn: ClientConnection = ClientConnection(
+        server=server, reader=ChunkedReader(chunks), writer=writer
+    )
+    client_conn._max_article_size = max_article_size
+    asyncio.run(client_conn.handle_client())
+    # the greeting is left out
+    return writer.data.decode().split("\r\n")[1:-1]
+
+
+def test_post_with_terminator_split_across_reads():
+    backend: PostingBackend = PostingBackend()
+    chunks: List[bytes] = [
+        b"POST\r\n",
+        b"Subject: split\r\nFrom: alice@example.com\r\n\r\n..dot",
+        b"ted\r\nlast line\r",
+        b"\n.",
+        b"\r",
+        b"\nPOST\r\n\r\nsecond\r\n.\r\n",
+    ]
+    replies: List[str] = _session(chunks, backend, max_article_size=1024)
+    assert replies == ["340 Send article to be posted", "240 Article received ok"] * 2
+    assert [article.body for article in backend.saved] == [".dotted\nlast line", "second"]
+    assert backend.saved[0].header["subject"] == "split"
+
+
+def test_post_above_max_article_size_is_rejected():
+    backend: PostingBackend = PostingBackend()
+    body: bytes = b"x" * 98 + b"\r\n"
+    chunks: List[bytes] = [b"POST\r\n", b"Subject: big\r\n\r\n"] + [body] * 20 + [b".\r\n"]
+    chunks += [b"POST\r\nSubject: small\r\n\r\nsmall\r\n.\r\n"]
+    replies: List[str] = _session(chunks, backend, max_article_size=1000)
+    assert replies == [
+        "340 Send article to be posted",
+        "441 Article too large",
+        "340 Send article to be posted",
+        "240 Article received ok",
+    ]
+    # the rejected article never reached the backend, the connection keeps working
+    assert [article.header["subject"] for article in backend.saved] == ["small"]
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Mapping
+
+import cbor2
+import pytest
+from tortoise import Tortoise
+
+from backend.dtn7sqlite import ingest
+from backend.dtn7sqlite.db import db_config
+from backend.dtn7sqlite.ingest import IngestPipeline, IngestStats, store_articles
+from backend.dtn7sqlite.models import Article, Newsgroup
+from backend.dtn7sqlite.registry import GroupWatermarks, NewsgroupRegistry
+from backend.dtn7sqlite.utils import add_overview_stats
+
+GROUP: str = "test.numbering"
+
+
+def _article(group: Newsgroup, i: int) -> dict:
+    return add_overview_stats(
+        {
+            "newsgroup": group,
+            "from_": "alice@example.com",
+            "subject": f"subject {i}",
+            "created_at": datetime(2022, 1, 1, tzinfo=timezone.utc),
+            "message_id": f"<{i}@test>",
+            "body": f"body {i}",
+            "references": "",
+        }
+    )
+
+
+async def _ingest_with_duplicates() -> None:
+    await Tortoise.init(config=db_config("sqlite://:memory:"))
+    await Tortoise.generate_schemas()
+    try:
+        await Newsgroup.create(name=GROUP)
+        registry: NewsgroupRegistry = NewsgroupRegistry()
+        await registry.load()
+        group: Newsgroup = registry[GROUP]
+
+        assert await store_articles([_article(group, i) for i in range(5)], registry) == 5
+        # <2@test> is already stored and <5@test> is in the batch twice
+        batch: List[dict] = [_article(group, i) for i in (2, 5, 5, 6)]
+        assert await store_articles(batch, registry) == 2
+
+        numbers: List[int] = (
+            await Article.filter(newsgroup_id=group.id)
+            .order_by("number")
+            .values_list("number", flat=True)
+        )
+        assert numbers == list(range(1, 8))
+        assert (await Newsgroup.get(id=group.id)).high_water == 7
+        watermarks: GroupWatermarks = registry.watermarks(group)
+        assert (watermarks.count, watermarks.low, watermarks.high) == (7, 1, 7)
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_duplicates_leave_no_gaps_in_numbering():
+    asyncio.run(_ingest_with_duplicates())
+
+
+def _bundle(group_name: str, i: int) -> bytes:
+    payload: bytes = cbor2.dumps({"subject": f"subject {i}", "body": f"body {i}", "references": ""})
+    primary_block: list = [
+        7,
+        0,
+        0,
+        [1, f"//{group_name}/~news"],
+        [1, "//node1/alice"],
+        [1, "//node1/alice"],
+        [700000000000 + i, 0],
+        3600000,
+    ]
+    return cbor2.dumps([primary_block, [1, 1, 0, 0, payload]])
+
+
+async def _run_pipeline(
+    bundle_ids: List[str], logger: logging.Logger, decoders: int = 2
+) -> IngestStats:
+    await Tortoise.init(config=db_config("sqlite://:memory:"))
+    await Tortoise.generate_schemas()
+    try:
+        await Newsgroup.create(name=GROUP)
+        registry: NewsgroupRegistry = NewsgroupRegistry()
+        await registry.load()
+
+        async def download(bundle_id: str) -> bytes:
+            await asyncio.sleep(0)
+            if bundle_id.startswith("missing"):
+                raise ConnectionError("404")
+            if bundle_id.startswith("garbage"):
+                return b"not a bundle"
+            return _bundle(GROUP, int(bundle_id.rsplit("-", 1)[1]))
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="test-decode") as executor:
+            pipeline: IngestPipeline = IngestPipeline(
+                download=download,
+                newsgroups=registry,
+                logger=logger,
+                executor=executor,
+                concurrency=3,
+                decoders=decoders,
+                batch_size=2,
+                progress_interval=1,
+            )
+            stats: IngestStats = await pipeline.run(bundle_ids)
+        assert await Article.filter(newsgroup_id=registry[GROUP].id).count() == stats.stored
+        return stats
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_pipeline_decodes_off_the_event_loop(monkeypatch, caplog):
+    decode_threads: List[str] = []
+
+    def decode_bundle(bundle_id: str, raw: bytes, newsgroups: Mapping[str, Newsgroup]) -> dict:
+        decode_threads.append(threading.current_thread().name)
+        return real_decode_bundle(bundle_id, raw, newsgroups)
+
+    real_decode_bundle = ingest.decode_bundle
+    monkeypatch.setattr(ingest, "decode_bundle", decode_bundle)
+    logger: logging.Logger = logging.getLogger("test.ingest")
+    bundle_ids: List[str] = [f"dtn://node1/alice-{700000000000 + i}-0" for i in range(5)]
+    bundle_ids += ["missing-1", "garbage-2"]
+
+    with caplog.at_level(logging.INFO, logger="test.ingest"):
+        stats: IngestStats = asyncio.run(_run_pipeline(bundle_ids, logger))
+
+    assert (stats.total, stats.stored, stats.failed, stats.processed) == (7, 5, 2, 7)
+    assert len(decode_threads) == 6
+    assert all(name.startswith("test-decode") for name in decode_threads)
+    # failed downloads count toward the progress, too
+    progress: List[str] = [r.message for r in caplog.records if "progress" in r.message]
+    assert len(progress) == 7
+
+
+@pytest.mark.parametrize("decoders", [1, 4])
+def test_pipeline_stores_every_bundle(decoders):
+    bundle_ids: List[str] = [f"dtn://node1/alice-{700000000000 + i}-0" for i in range(9)]
+    logger: logging.Logger = logging.getLogger("test.ingest")
+    stats: IngestStats = asyncio.run(_run_pipeline(bundle_ids, logger, decoders))
+    assert (stats.stored, stats.failed) == (9, 0)
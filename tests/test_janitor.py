@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from tortoise import Tortoise
+
+from backend.dtn7sqlite.db import db_config
+from backend.dtn7sqlite.ingest import store_articles
+from backend.dtn7sqlite.janitor import JanitorStats, expire_articles
+from backend.dtn7sqlite.models import Newsgroup
+from backend.dtn7sqlite.registry import GroupWatermarks, NewsgroupRegistry
+from backend.dtn7sqlite.utils import add_overview_stats
+
+EPOCH: datetime = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+def _article(group: Newsgroup, i: int, age: int) -> dict:
+    return add_overview_stats(
+        {
+            "newsgroup": group,
+            "from_": "alice@example.com",
+            "subject": f"subject {i}",
+            "created_at": EPOCH - timedelta(days=age),
+            "message_id": f"<{i}@{group.name}>",
+            "body": f"body {i}",
+            "references": "",
+        }
+    )
+
+
+def _snapshot(registry: NewsgroupRegistry) -> Dict[str, Tuple[int, int, int]]:
+    snapshot: Dict[str, Tuple[int, int, int]] = {}
+    for name, group in registry.items():
+        watermarks: GroupWatermarks = registry.watermarks(group)
+        snapshot[name] = (watermarks.count, watermarks.low, watermarks.high)
+    return snapshot
+
+
+async def _expire() -> None:
+    await Tortoise.init(config=db_config("sqlite://:memory:"))
+    await Tortoise.generate_schemas()
+    try:
+        for name in ("test.a", "test.b", "test.c"):
+            await Newsgroup.create(name=name)
+        registry: NewsgroupRegistry = NewsgroupRegistry()
+        await registry.load()
+
+        # articles are numbered in arrival order, but expire by age: in test.a the articles
+        # numbered 1 and 3 are the old ones, test.b only has old articles, test.c only new ones
+        ages: Dict[str, List[int]] = {"test.a": [9, 1, 8, 2, 1], "test.b": [7, 9], "test.c": [1]}
+        for name, group_ages in ages.items():
+            articles: List[dict] = [
+                _article(registry[name], i, age) for i, age in enumerate(group_ages)
+            ]
+            await store_articles(articles, registry)
+
+        stats: JanitorStats = JanitorStats()
+        assert await expire_articles(EPOCH - timedelta(days=5), 2, stats, registry) == 4
+        assert stats.articles == 4
+        assert _snapshot(registry) == {
+            "test.a": (3, 2, 5),
+            "test.b": (0, 0, 0),
+            "test.c": (1, 1, 1),
+        }
+
+        # the incremental updates end up where a full recount does
+        expected: Dict[str, Tuple[int, int, int]] = _snapshot(registry)
+        await registry.refresh()
+        assert _snapshot(registry) == expected
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_expiry_adjusts_watermarks_of_affected_groups():
+    asyncio.run(_expire())
@@ -0,0 +1,242 @@
+from typing import List
+
+import pytest
+
+from backend.dtn7sqlite.models import Newsgroup
+from backend.dtn7sqlite.registry import NewsgroupRegistry
+from utils import (
+    ArticleParser,
+    PostedArticle,
+    compile_wildmat,
+    encode_multiline,
+    wildmat_prefix,
+)
+
+GROUP_NAMES: List[str] = [
+    "alt.test",
+    "comp.lang.c",
+    "comp.lang.python",
+    "comp.os.linux",
+    "comp.os.linux.misc",
+    "comp.os.linux.x",
+    "comp.os",
+    "compost",
+    "monntpy.dev",
+    "monntpy.dev.x",
+]
+
+
+def _matches(wildmat: str, name: str) -> bool:
+    return compile_wildmat(wildmat).fullmatch(name) is not None
+
+
+@pytest.mark.parametrize(
+    "wildmat, name, expected",
+    [
+        ("*", "comp.lang.c", True),
+        ("comp.*", "comp.lang.c", True),
+        ("comp.*", "compost", False),
+        ("comp.lang.c", "comp.lang.c", True),
+        ("comp.lang.c", "comp.lang.cc", False),
+        # a match is anchored at both ends
+        ("lang", "comp.lang.c", False),
+        ("*lang*", "comp.lang.c", True),
+        # "?" is exactly one character
+        ("comp.os.linux.?", "comp.os.linux.x", True),
+        ("comp.os.linux.?", "comp.os.linux.", False),
+        ("comp.os.linux.?", "comp.os.linux.misc", False),
+        ("comp.os.l?nux", "comp.os.linux", True),
+    ],
+)
+def test_wildmat_patterns(wildmat, name, expected):
+    assert _matches(wildmat, name) is expected
+
+
+@pytest.mark.parametrize(
+    "wildmat, name, expected",
+    [
+        # the rightmost matching pattern decides
+        ("comp.*,!comp.os.*", "comp.lang.c", True),
+        ("comp.*,!comp.os.*", "comp.os.linux", False),
+        ("comp.*,!comp.os.*,comp.os.linux.*", "comp.os.linux.misc", True),
+        ("comp.*,!comp.os.*,comp.os.linux.*", "comp.os.linux", False),
+        # a negation left of the pattern that matches doesn't count
+        ("!comp.os.*,comp.*", "comp.os.linux", True),
+        ("comp.*,!*.misc,*linux*", "comp.os.linux.misc", True),
+        ("comp.*,*linux*,!*.misc", "comp.os.linux.misc", False),
+        # a name no pattern matches doesn't match, whatever is negated
+        ("comp.*,!comp.os.*", "alt.test", False),
+        # only negated patterns never match
+        ("!comp.*", "alt.test", False),
+        ("!comp.*,!alt.*", "monntpy.dev", False),
+    ],
+)
+def test_wildmat_negation_is_evaluated_right_to_left(wildmat, name, expected):
+    assert _matches(wildmat, name) is expected
+
+
+@pytest.mark.parametrize(
+    "wildmat, name, expected",
+    [
+        # wildmats know no character classes, brackets are matched literally
+        ("[ab]", "[ab]", True),
+        ("[ab]", "a", False),
+        ("comp.[a-z]*", "comp.[a-z]ero", True),
+        ("comp.[a-z]*", "comp.lang.c", False),
+        # so are regex metacharacters
+        ("comp.os", "compaos", False),
+        ("a+b", "a+b", True),
+        ("a+b", "aab", False),
+        ("(a|b)", "(a|b)", True),
+        ("(a|b)", "a", False),
+        ("^a$", "^a$", True),
+        ("a\\b", "a\\b", True),
+        ("a{2}", "aa", False),
+    ],
+)
+def test_wildmat_escapes_regex_metacharacters(wildmat, name, expected):
+    assert _matches(wildmat, name) is expected
+
+
+@pytest.mark.parametrize(
+    "wildmat, prefix",
+    [
+        ("*", ""),
+        ("comp.*", "comp."),
+        ("comp.os.linux*", "comp.os.linux"),
+        ("comp.[a-z]*", "comp.[a-z]"),
+        ("comp.lang.c", None),
+        ("comp.*.misc*", None),
+        ("comp.?*", None),
+        ("comp.*,alt.*", None),
+        ("!comp.*", None),
+    ],
+)
+def test_wildmat_prefix(wildmat, prefix):
+    assert wildmat_prefix(wildmat) == prefix
+
+
+@pytest.mark.parametrize(
+    "wildmat",
+    ["*", "comp.*", "comp.os*", "comp.os.linux.*", "monntpy.*", "nothing.*", "a.*", "comp*"],
+)
+def test_registry_prefix_lookup_matches_regex(wildmat):
+    registry: NewsgroupRegistry = NewsgroupRegistry()
+    for group_id, name in enumerate(reversed(GROUP_NAMES), start=1):
+        registry.add(Newsgroup(id=group_id, name=name))
+
+    assert wildmat_prefix(wildmat) is not None
+    expected: List[str] = sorted(name for name in GROUP_NAMES if _matches(wildmat, name))
+    assert [group.name for group in registry.match(wildmat)] == expected
+
+
+def _parse(lines: List[bytes], max_size: int = 0) -> ArticleParser:
+    parser: ArticleParser = ArticleParser(max_size=max_size)
+    for line in lines[:-1]:
+        assert parser.feed(line) is False
+    assert parser.feed(lines[-1]) is True
+    return parser
+
+
+def test_article_parser_unstuffs_dots():
+    article: PostedArticle = _parse(
+        [
+            b"Subject: dots\r",
+            b"\r",
+            b"..\r",
+            b"..leading dot\r",
+            b"middle . dot\r",
+            b"...\r",
+            b".\r",
+        ]
+    ).article()
+    assert article.body == ".\n.leading dot\nmiddle . dot\n.."
+
+
+def test_article_parser_unfolds_header_fields():
+    article: PostedArticle = _parse(
+        [
+            b"Subject: a long\r",
+            b"\tfolded\r",
+            b"   subject\r",
+            b"From: alice@example.com\r",
+            b"Newsgroups: monntpy.dev\r",
+            b"\r",
+            b"body\r",
+            b".\r",
+        ]
+    ).article()
+    assert article.header["subject"] == "a long folded subject"
+    assert article.header["from"] == "alice@example.com"
+    assert article.header["newsgroups"] == "monntpy.dev"
+    assert article.header["references"] == ""
+    assert article.body == "body"
+
+
+def test_article_parser_accepts_bare_lf_and_counts_bytes():
+    lines: List[bytes] = [b"Subject: lf", b"", b"first", b"", b"third", b"."]
+    parser: ArticleParser = _parse(lines)
+    assert parser.article().body == "first\n\nthird"
+    # every line counts with its CRLF, the terminating line doesn't count
+    assert parser.size == sum(len(line) + 2 for line in lines[:-1])
+
+
+def test_article_parser_decodes_invalid_utf8():
+    article: PostedArticle = _parse(
+        [b"Subject: caf\xc3\xa9\r", b"\r", b"\xff\xfe\r", b".\r"]
+    ).article()
+    assert article.header["subject"] == "caf\u00e9"
+    assert article.body == "\ufffd\ufffd"
+
+
+def test_article_parser_drops_articles_above_max_size():
+    body: List[bytes] = [b"x" * 98 + b"\r"] * 20
+    parser: ArticleParser = _parse([b"Subject: big\r", b"\r"] + body + [b".\r"], max_size=1000)
+    assert parser.too_large is True
+    # the rest of the article is still read up to the terminating line
+    assert parser.size == 14 + 2 + 20 * 100
+    assert parser.article().body == ""
+    assert parser.article().header["subject"] == ""
+
+
+def test_article_parser_keeps_articles_up_to_max_size():
+    lines: List[bytes] = [b"Subject: fits\r", b"\r", b"x" * 81 + b"\r", b".\r"]
+    parser: ArticleParser = _parse(lines, max_size=100)
+    assert parser.too_large is False
+    assert parser.size == 100
+    assert parser.article().body == "x" * 81
+
+
+@pytest.mark.parametrize(
+    "lines, encoded",
+    [
+        (["a", "b"], b"a\r\nb\r\n.\r\n"),
+        ([], b".\r\n"),
+        ([""], b"\r\n.\r\n"),
+        # lines starting with a dot are stuffed, dots elsewhere are not
+        ([".", "..", ".a", "a.b", "a."], b"..\r\n...\r\n..a\r\na.b\r\na.\r\n.\r\n"),
+        # line breaks within a line, e.g. in a body, are normalized and the lines after them
+        # stuffed, too
+        (["a\nb", "c\r\nd"], b"a\r\nb\r\nc\r\nd\r\n.\r\n"),
+        (["body\n.\n..x\r\n.y"], b"body\r\n..\r\n...x\r\n..y\r\n.\r\n"),
+        (["a\n\nb", ""], b"a\r\n\r\nb\r\n\r\n.\r\n"),
+        # a lone CR is not a line break
+        (["a\rb"], b"a\rb\r\n.\r\n"),
+        (["gr\u00fc\u00dfe"], "gr\u00fc\u00dfe\r\n.\r\n".encode()),
+    ],
+)
+def test_encode_multiline(lines, encoded):
+    assert encode_multiline(lines) == encoded
+
+
+def test_encode_multiline_without_terminator():
+    assert encode_multiline([], terminate=False) == b""
+    assert (
+        encode_multiline(["Subject: x", ".hidden"], terminate=False)
+        == b"Subject: x\r\n..hidden\r\n"
+    )
+    assert encode_multiline(["a\n.b"], terminate=False) == b"a\r\n..b\r\n"
+    # blocks encoded separately, as the article cache does, concatenate to the whole response
+    head: bytes = encode_multiline(["Subject: x", ".h"], terminate=False)
+    body: bytes = encode_multiline([".b\nc"], terminate=False)
+    assert head + b"\r\n" + body + b".\r\n" == encode_multiline(["Subject: x", ".h", "", ".b\nc"])
@@ -1,15 +1,19 @@
 import os
+import re
+from collections import defaultdict
 from datetime import datetime, timezone
 from enum import Enum
-from fnmatch import fnmatch
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import DefaultDict, Iterable, List, Optional, Tuple
 
 import toml
 
-from backend.dtn7sqlite.models import Article
 from config import server_config
 
+# a line break (bare LF or CRLF) and the dot a following line may start with
+_LINE_BREAK: "re.Pattern[bytes]" = re.compile(rb"\r?\n(\.?)")
+
 
 class RangeParseStatus(Enum):
     SUCCESS = 0
@@ -53,6 +57,131 @@ class ParsedRange:
                 self.parse_status = RangeParseStatus.FAILURE
 
 
+def encode_multiline(lines: Iterable[str], terminate: bool = True) -> bytes:
+    """
+    Encodes the lines of a multi-line response for the wire (RFC 3977 Sec. 3.1.1): line breaks
+    within the lines, e.g. in an article body, are normalized to CRLF and every line starting with
+    a dot is dot-stuffed. The lines are encoded once as a whole and the rest is done in a single
+    regex pass over the bytes.
+
+    Args:
+        lines: lines of the response, may contain line breaks themselves
+        terminate: whether to append the terminating dot line
+
+    Returns:
+        the CRLF terminated lines, followed by the terminating dot line if terminate is set
+    """
+    lines = list(lines)
+    if len(lines) == 0:
+        return b".\r\n" if terminate else b""
+    data: bytes = "\n".join(lines).encode(encoding="utf-8")
+    data = _LINE_BREAK.sub(rb"\r\n\1\1", data)
+    if data.startswith(b"."):
+        data = b"." + data
+    return data + (b"\r\n.\r\n" if terminate else b"\r\n")
+
+
+class PostedArticle:
+    """
+    An article received from a client with POST, as handed to Backend.save_article.
+
+    Header field names are lower-cased, and folded fields are unfolded. A field the article
+    doesn't have reads as an empty string. Body lines are separated by bare LFs.
+    """
+
+    def __init__(self, header: DefaultDict[str, str], body: str, size: int):
+        self.header: DefaultDict[str, str] = header
+        self.body: str = body
+        # bytes received for the article, line breaks included
+        self.size: int = size
+
+
+class ArticleParser:
+    """
+    Parses an article sent after POST line by line as the lines come in, so the article is never
+    held as a list of lines and parsing it takes time linear in its size.
+
+    Header lines are decoded and unfolded as they arrive. Body lines are un-dot-stuffed and
+    appended to a single buffer, which is decoded once when the article is complete. Once the
+    article is larger than max_size bytes, the rest of it is only read up to the terminating dot
+    line and discarded, see too_large.
+    """
+
+    def __init__(self, max_size: int = 0):
+        self._max_size: int = max_size
+        self._header: DefaultDict[str, str] = defaultdict(str)
+        self._field_name: str = ""
+        self._in_header: bool = True
+        self._body: bytearray = bytearray()
+        self._body_lines: int = 0
+        self._size: int = 0
+        self.too_large: bool = False
+
+    def feed(self, line: bytes) -> bool:
+        """
+        Consumes a line of the article.
+
+        Args:
+            line: the line as received, without its LF
+
+        Returns:
+            True if it was the terminating dot line, i.e. the article is complete
+        """
+        line = line.rstrip(b"\r")
+        if line == b".":
+            return True
+        self._size += len(line) + 2
+        if self.too_large:
+            return False
+        if 0 < self._max_size < self._size:
+            # stop buffering, the article will be rejected anyway
+            self.too_large = True
+            self._header.clear()
+            self._body = bytearray()
+            return False
+
+        if line.startswith(b"."):
+            line = line[1:]
+        if self._in_header:
+            self._feed_header(line.decode(encoding="utf-8", errors="replace"))
+        else:
+            if self._body_lines > 0:
+                self._body += b"\n"
+            self._body += line
+            self._body_lines += 1
+        return False
+
+    def _feed_header(self, line: str) -> None:
+        if len(line.strip()) == 0:
+            # the empty line separates header and body
+            self._in_header = False
+            return
+        if line[0] in " \t":
+            # folded field, continues the previous one
+            if len(self._field_name) > 0:
+                self._header[self._field_name] = f"{self._header[self._field_name]} {line.strip()}"
+        elif ":" in line:
+            field_name, field_value = line.split(sep=":", maxsplit=1)
+            self._field_name = field_name.strip().lower()
+            self._header[self._field_name] = field_value.strip()
+        # sometimes clients send fishy headers … we'll just ignore them.
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def article(self) -> PostedArticle:
+        """
+        Returns:
+            the parsed article, once feed has consumed the terminating dot line
+        """
+        return PostedArticle(
+            header=self._header,
+            body=self._body.decode(encoding="utf-8", errors="replace"),
+            size=self._size,
+        )
+
+
 def get_version() -> str:
     pyproject_path = Path(os.path.dirname(os.path.abspath(__file__))) / "pyproject.toml"
     pyproject = toml.loads(open(str(pyproject_path)).read())
@@ -63,27 +192,53 @@ def build_xref(article_id: int, group_name: str) -> str:
     return f"{server_config['domain_name']} {group_name}:{article_id}"
 
 
-def get_bytes_len(article: Article) -> int:
-    result = 0
-    for val in article.__dict__.values():
-        if type(val) is not bool:
-            result += len(str(val).encode("utf-8"))
-    return result
+@lru_cache(maxsize=256)
+def compile_wildmat(wildmat: str) -> "re.Pattern[str]":
+    """
+    Compiles a wildmat (RFC 3977 Sec. 4) into a single regex. Compiled patterns are cached, so
+    clients repeating the same LIST or NEWNEWS pattern don't pay for compiling it again.
+
+    A wildmat is a comma separated list of patterns, each optionally negated with "!". "*" matches
+    any sequence of characters, "?" any single character. The patterns are evaluated from right to
+    left: the rightmost pattern matching a name decides, and a name matches the wildmat if that
+    pattern is not negated. So a name matches if some pattern matches it and no negated pattern
+    to the right of that one does, which is what the regex checks with negative lookaheads.
+
+    :param wildmat: wildmat to compile
+    :return: compiled regex, to be used with fullmatch()
+    """
+    patterns: List[Tuple[bool, str]] = []
+    for pattern in wildmat.split(","):
+        negated: bool = pattern.startswith("!")
+        patterns.append((negated, _wildmat_pattern_to_regex(pattern[1:] if negated else pattern)))
+
+    alternatives: List[str] = []
+    for i, (negated, regex) in enumerate(patterns):
+        if negated:
+            continue
+        later_negated: List[str] = [r for j, (n, r) in enumerate(patterns) if j > i and n]
+        if len(later_negated) > 0:
+            regex = f"(?!(?:{'|'.join(later_negated)})\\Z){regex}"
+        alternatives.append(regex)
+    if len(alternatives) == 0:
+        # only negated patterns never match anything
+        return re.compile(r"(?!)")
+    return re.compile("|".join(f"(?:{a})" for a in alternatives), re.DOTALL)
 
 
-def get_num_lines(article: Article) -> int:
-    return len(article.body.split("\n"))
+def _wildmat_pattern_to_regex(pattern: str) -> str:
+    return "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in pattern)
 
 
-def groupname_filter(groups: List[dict], pattern: str) -> filter:
+def wildmat_prefix(wildmat: str) -> Optional[str]:
     """
-    A very incomplete wildmat implementation.
-
-    :param groups: groups to filter
-    :param pattern: pattern to filter with
-    :return: filter object containing matching newsgroups
+    Returns the literal prefix if the wildmat is a single pattern of the form "prefix*", e.g.
+    "monntpy.*". Such patterns can be answered by a range lookup over sorted names instead of
+    matching every name.
     """
-    return filter(lambda v: fnmatch(v["name"], pattern), groups)
+    if wildmat.endswith("*") and not any(c in wildmat[:-1] for c in "*?,!"):
+        return wildmat[:-1]
+    return None
 
 
 def get_datetime(date_str: str, time_str: str):